@@ -0,0 +1,259 @@
+"""
+Raw response archival in WARC format and offline re-extraction
+
+Jobs with archiving enabled write every fetched page to a gzipped WARC file
+(one gzip member per record, readable by standard WARC tools). Bodies are
+stored as decoded, so Content-Encoding and length headers are rewritten, and
+pages cut off at MAX_RESPONSE_BYTES carry a WARC-Truncated header. Pages
+rendered with Playwright are stored as "resource" records of the final DOM.
+
+Re-extraction replays an archive through the current extractors on a pool of
+worker processes, without any network access. The parent only indexes record
+offsets; workers read the records themselves.
+"""
+import gzip
+import multiprocessing
+import os
+import threading
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.getenv("RESULTS_DIR", "results"), "archives"))
+REEXTRACT_WORKERS = int(os.getenv("REEXTRACT_WORKERS", str(os.cpu_count() or 1)))
+# Starting worker processes costs more than extracting a handful of pages
+REEXTRACT_PARALLEL_MIN_PAGES = int(os.getenv("REEXTRACT_PARALLEL_MIN_PAGES", "20"))
+
+READ_CHUNK_BYTES = 64 * 1024
+
+# Describe the stored (decoded, possibly truncated) body rather than the wire format
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def archive_path(job_id: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{job_id}.warc.gz")
+
+
+def archive_dir_writable() -> bool:
+    """Whether archives can be written here (serverless filesystems are read-only outside /tmp)"""
+    try:
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(ARCHIVE_DIR, os.W_OK)
+
+
+class WarcWriter:
+    """Appends records to one job's archive; safe to share between threads"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def _write(self, record_type: str, url: str, content_type: str, block: bytes, extra: Dict[str, str]):
+        headers = {
+            "WARC-Type": record_type,
+            "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+            "WARC-Date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "WARC-Target-URI": url,
+            "Content-Type": content_type,
+            **extra,
+            "Content-Length": str(len(block)),
+        }
+        head = "WARC/1.0\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        data = gzip.compress(head.encode("utf-8") + block + b"\r\n\r\n", compresslevel=6)
+        with self._lock:
+            self._file.write(data)
+            self.records += 1
+
+    def write_response(self, url: str, status: int, reason: str, headers: Dict[str, str],
+                       body: bytes, truncated: bool = False):
+        """Record an HTTP response as fetched"""
+        lines = [f"HTTP/1.1 {status} {reason or ''}".rstrip()]
+        lines += [f"{k}: {v}" for k, v in headers.items() if k.lower() not in DROPPED_HEADERS]
+        lines.append(f"Content-Length: {len(body)}")
+        block = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", "replace") + body
+        extra = {"WARC-Truncated": "length"} if truncated else {}
+        self._write("response", url, "application/http; msgtype=response", block, extra)
+
+    def write_resource(self, url: str, body: bytes, content_type: str = "text/html; charset=utf-8"):
+        """Record content that didn't come from a plain HTTP response (rendered DOM)"""
+        self._write("resource", url, content_type, body, {})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _parse_headers(lines: List[bytes]) -> Dict[str, str]:
+    headers = {}
+    for line in lines:
+        name, _, value = line.decode("latin-1").partition(":")
+        if value:
+            headers[name.strip()] = value.strip()
+    return headers
+
+
+def _read_member(f, pending: bytes) -> Tuple[Optional[bytes], int, bytes]:
+    """
+    Decompress the gzip member starting at the front of pending (then f)
+
+    Returns (data, compressed length, bytes read past the member), or None
+    for data at the end of the file or on a truncated member.
+    """
+    if not pending:
+        pending = f.read(READ_CHUNK_BYTES)
+        if not pending:
+            return None, 0, b""
+    decompressor = zlib.decompressobj(31)  # wbits 31: gzip container
+    parts = []
+    length = 0
+    while True:
+        parts.append(decompressor.decompress(pending))
+        if decompressor.eof:
+            length += len(pending) - len(decompressor.unused_data)
+            return b"".join(parts), length, decompressor.unused_data
+        length += len(pending)
+        pending = f.read(READ_CHUNK_BYTES)
+        if not pending:
+            return None, 0, b""
+
+
+def _members(path: str) -> Iterator[Tuple[int, bytes]]:
+    """(file offset, decompressed bytes) of each gzip member, one at a time"""
+    with open(path, "rb") as f:
+        offset, pending = 0, b""
+        while True:
+            data, length, pending = _read_member(f, pending)
+            if data is None:
+                return
+            yield offset, data
+            offset += length
+
+
+def _parse_record(data: bytes) -> Optional[Dict[str, Any]]:
+    """A response or resource record from one member's bytes; None for other record types"""
+    head, _, rest = data.partition(b"\r\n\r\n")
+    version, *header_lines = head.split(b"\r\n")
+    if not version.startswith(b"WARC/"):
+        return None
+    warc = _parse_headers(header_lines)
+    block = rest[:int(warc.get("Content-Length", "0"))]
+
+    record_type = warc.get("WARC-Type")
+    if record_type == "response":
+        http_head, _, body = block.partition(b"\r\n\r\n")
+        status_line, *lines = http_head.split(b"\r\n")
+        parts = status_line.split(b" ", 2)
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        return {
+            "url": warc.get("WARC-Target-URI"),
+            "type": record_type,
+            "status": status,
+            "headers": _parse_headers(lines),
+            "body": body,
+            "truncated": "WARC-Truncated" in warc,
+        }
+    if record_type == "resource":
+        return {
+            "url": warc.get("WARC-Target-URI"),
+            "type": record_type,
+            "status": 200,
+            "headers": {"Content-Type": warc.get("Content-Type", "text/html")},
+            "body": block,
+            "truncated": False,
+        }
+    return None
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the response and resource records of a WARC file, each with its file offset
+
+    Expects one record per gzip member, as WarcWriter writes them.
+    """
+    for offset, data in _members(path):
+        record = _parse_record(data)
+        if record is not None:
+            record["offset"] = offset
+            yield record
+
+
+def read_record_at(path: str, offset: int) -> Optional[Dict[str, Any]]:
+    """The record in the gzip member starting at offset"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data, _, _ = _read_member(f, b"")
+    return _parse_record(data) if data is not None else None
+
+
+_worker_scraper = None
+
+
+def _extract_record(args: Tuple[str, int, Optional[List[str]], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Process pool entry point: read and extract one archived page"""
+    global _worker_scraper
+    path, offset, selectors, extraction_schema = args
+    if _worker_scraper is None:
+        from app.scraper import WebScraper
+        _worker_scraper = WebScraper()
+    record = read_record_at(path, offset)
+    try:
+        return _worker_scraper.extract_archived(record, selectors, extraction_schema)
+    except Exception as e:
+        return {"url": record["url"], "error": str(e)}
+
+
+def reextract(
+    path: str,
+    selectors: Optional[List[str]] = None,
+    extraction_schema: Optional[Dict[str, Any]] = None,
+    crawl: bool = False,
+    workers: int = REEXTRACT_WORKERS
+) -> Dict[str, Any]:
+    """
+    Run the current extractors over an archived job
+
+    Returns a result shaped like the original job's: a single page, or for
+    crawls the same pages list _crawl_site produces.
+    """
+    if not os.path.exists(path):
+        raise Exception("No archive found for this job")
+
+    # Latest record per URL: resumed crawls and auto-rendered pages can archive one twice.
+    # Only offsets are kept; each worker reads its own records, so bodies are never
+    # all in memory or pickled across processes.
+    offsets = {}
+    for record in read_records(path):
+        offsets[record["url"]] = record["offset"]
+    tasks = [(path, offset, selectors, extraction_schema) for offset in offsets.values()]
+    if not tasks:
+        raise Exception("Archive contains no pages")
+
+    if workers > 1 and len(tasks) >= REEXTRACT_PARALLEL_MIN_PAGES:
+        # spawn: workers must not inherit the event loop and database client threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+            pages = list(pool.map(_extract_record, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        pages = [_extract_record(task) for task in tasks]
+
+    if not crawl:
+        page = pages[0]
+        if "error" in page:
+            raise Exception(f"Re-extraction failed: {page['error']}")
+        return page
+
+    from app.scraper import crawl_page_summary
+    summaries = [crawl_page_summary(page, extraction_schema is not None) for page in pages if "error" not in page]
+    return {
+        "base_url": pages[0]["url"],
+        "pages_crawled": len(summaries),
+        "pages": summaries,
+        "crawl_type": "site_wide",
+    }
@@ -0,0 +1,77 @@
+"""
+In-process cache for completed job documents
+
+Completed results never change, so repeat reads (result and job lookups,
+exports, the History page) can skip MongoDB. Entries are evicted least
+recently used first once the cache exceeds its byte budget, and expire after
+a TTL so deletes made by other processes are eventually seen.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.compression import dumps
+from app.metrics import REGISTRY, Counter, Gauge
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, size, expires_at)
+        self._deleted: Dict[str, float] = {}  # key -> until when puts are refused
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[2] < time.monotonic():
+            if entry is not None:
+                self.invalidate(key)
+            CACHE_REQUESTS.inc(result="miss")
+            return None
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(result="hit")
+        return entry[0]
+
+    def put(self, key: str, value: Any, size: Optional[int] = None):
+        """Cache value; size is its serialized size in bytes, measured here if not known"""
+        if self.max_bytes <= 0:
+            return
+        if key in self._deleted:
+            if self._deleted[key] > time.monotonic():
+                return
+            del self._deleted[key]
+        if size is None:
+            size = len(dumps(value))
+        if size > self.max_bytes:
+            return
+        self.invalidate(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted_size
+
+    def invalidate(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[1]
+
+    def forget(self, key: str):
+        """Invalidate a deleted key and keep reads already in flight from caching it again"""
+        now = time.monotonic()
+        self._deleted = {k: until for k, until in self._deleted.items() if until > now}
+        self._deleted[key] = now + self.ttl
+        self.invalidate(key)
+
+
+CACHE_REQUESTS = REGISTRY.register(Counter("result_cache_requests_total", "Result cache lookups by outcome"))
+
+result_cache = ResultCache(
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300")),
+)
+
+REGISTRY.register(Gauge("result_cache_bytes", "Estimated size of cached results", fn=lambda: result_cache.size_bytes))
+REGISTRY.register(Gauge("result_cache_entries", "Cached job documents", fn=lambda: len(result_cache._entries)))
@@ -0,0 +1,220 @@
+"""
+Result blob compression, fast JSON encoding and HTTP response compression
+
+zstandard, brotli and orjson are optional; without them results fall back to
+gzip and responses to the standard json module and gzip encoding.
+"""
+import asyncio
+import gzip
+import importlib.util
+import json
+import os
+import zlib
+from typing import Any, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+RESULT_COMPRESSION = os.getenv("RESULT_COMPRESSION", "zstd" if ZSTD_AVAILABLE else "gzip").lower()
+RESULT_COMPRESS_MIN_BYTES = int(os.getenv("RESULT_COMPRESS_MIN_BYTES", str(64 * 1024)))
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def pack_result_data(data: Any) -> Tuple[Any, int]:
+    """
+    Compress a result payload for storage if it is large enough to be worth it
+
+    Returns the payload to store and its serialized (uncompressed) size.
+    """
+    if data is None:
+        return None, 0
+    raw = dumps(data)
+    if RESULT_COMPRESSION == "none" or len(raw) < RESULT_COMPRESS_MIN_BYTES:
+        return data, len(raw)
+    codec = "zstd" if RESULT_COMPRESSION == "zstd" and ZSTD_AVAILABLE else "gzip"
+    return {"_compressed": codec, "size": len(raw), "blob": _compress(raw, codec)}, len(raw)
+
+
+def _is_packed(data: Any) -> bool:
+    return isinstance(data, dict) and "_compressed" in data and "blob" in data
+
+
+def unpack_result_data(data: Any) -> Any:
+    """Inverse of pack_result_data; uncompressed payloads pass through"""
+    if _is_packed(data):
+        return loads(_decompress(bytes(data["blob"]), data["_compressed"]))
+    return data
+
+
+async def unpack_result_data_async(data: Any) -> Any:
+    """unpack_result_data, decompressing in the default executor so the event loop isn't blocked"""
+    if _is_packed(data):
+        return await asyncio.get_running_loop().run_in_executor(None, unpack_result_data, data)
+    return data
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    if BROTLI_AVAILABLE and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class _StreamEncoder:
+    """Incremental brotli or gzip encoder for one response body"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            import brotli
+            encoder = brotli.Compressor(quality=4)
+            self._process, self._finish = encoder.process, encoder.finish
+        else:
+            encoder = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+            self._process, self._finish = encoder.compress, encoder.flush
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        out = self._process(data) if data else b""
+        return out + self._finish() if last else out
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip per Accept-Encoding
+
+    Whether to compress is decided from the response headers: already encoded,
+    non-text (archives, images) and declared-small responses pass straight
+    through. Compressed bodies are encoded chunk by chunk as they stream, so
+    file downloads are never held in memory; only responses without a
+    Content-Length are held back until they reach minimum_size.
+    """
+
+    def __init__(self, app, minimum_size: int = RESPONSE_COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    def _should_compress(self, headers: dict) -> bool:
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        length = headers.get(b"content-length")
+        return (
+            b"content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and (length is None or int(length) >= self.minimum_size)
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = _choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        encoder = None
+        held = []  # leading chunks of a body of unknown length, until it reaches minimum_size
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough, encoder
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if not self._should_compress({k.lower(): v for k, v in message.get("headers", [])}):
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            response_headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+            response_headers += [(b"content-encoding", encoding.encode()), (b"vary", b"Accept-Encoding")]
+
+            if encoder is None:
+                held.append(body)
+                size = sum(len(chunk) for chunk in held)
+                if size < self.minimum_size:
+                    if more_body:
+                        return
+                    # Ended below the threshold: send it as it was
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": b"".join(held)})
+                    return
+                encoder = _StreamEncoder(encoding)
+                body = b"".join(held)
+                held.clear()
+                if not more_body:
+                    # Whole body in hand, so the compressed length can be declared
+                    payload = encoder.compress(body, last=True)
+                    response_headers.append((b"content-length", str(len(payload)).encode()))
+                    await send(dict(start_message, headers=response_headers))
+                    await send({"type": "http.response.body", "body": payload})
+                    return
+                await send(dict(start_message, headers=response_headers))
+
+            chunk = encoder.compress(body, last=not more_body)
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
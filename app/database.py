@@ -1,7 +1,11 @@
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+# motor/pymongo are imported on first use: they are a large share of
+# serverless cold-start time and many requests never touch the database
+
 load_dotenv()
 
 # Use environment variable for MongoDB connection, fallback to local
@@ -9,23 +13,36 @@ MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "webscraper_pro")
 
 class Database:
-    client: AsyncIOMotorClient = None
+    client = None  # AsyncIOMotorClient, created on first use
     db = None
+    connect_failed = False
 
 db = Database()
 
-async def connect_to_mongo():
-    """Connect to MongoDB"""
+def _create_client():
+    """Create the Motor client and start the job write buffer"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
     try:
         db.client = AsyncIOMotorClient(MONGODB_URL)
         db.db = db.client[DATABASE_NAME]
+        job_writer.start()
         print("Connected to MongoDB")
     except Exception as e:
+        db.connect_failed = True
         print(f"Could not connect to MongoDB: {e}")
 
+async def connect_to_mongo():
+    """Connect to MongoDB (eagerly; get_database() also connects on demand)"""
+    if db.db is None:
+        _create_client()
+    job_writer.start()
+
 async def close_mongo_connection():
     """Close MongoDB connection"""
     try:
+        # Buffered job writes must land before the client goes away
+        await job_writer.close()
         if db.client:
             db.client.close()
             print("MongoDB connection closed")
@@ -33,5 +50,191 @@ async def close_mongo_connection():
         print(f"Error closing MongoDB connection: {e}")
 
 def get_database():
-    """Get database instance"""
+    """Get database instance, creating the client on first call"""
+    if db.db is None and not db.connect_failed:
+        _create_client()
     return db.db
+
+
+class JobWriter:
+    """
+    Write-behind buffer for job documents
+
+    Inserts and status/progress updates are coalesced per job and flushed
+    with a single bulk_write every JOB_WRITE_INTERVAL_MS, or sooner once
+    JOB_WRITE_BATCH_SIZE jobs have pending writes. Must be used from the
+    event loop thread; readers merge pending writes in with `overlay`.
+    """
+
+    def __init__(self):
+        # Serverless instances freeze between requests, so write through there by default
+        default_interval = "0" if os.getenv("VERCEL") else "250"
+        self.flush_interval = int(os.getenv("JOB_WRITE_INTERVAL_MS", default_interval)) / 1000
+        self.max_batch = int(os.getenv("JOB_WRITE_BATCH_SIZE", "100"))
+        w = os.getenv("MONGO_WRITE_CONCERN", "1")
+        journal = os.getenv("MONGO_WRITE_JOURNAL")
+        self.write_concern_options = {
+            "w": int(w) if w.isdigit() else w,
+            "j": journal.lower() == "true" if journal else None,
+        }
+        self._inserts: Dict[str, dict] = {}
+        self._updates: Dict[str, Dict[str, dict]] = {}
+        # The batch a flush is writing; still visible to readers until bulk_write returns
+        self._inflight_inserts: Dict[str, dict] = {}
+        self._inflight_updates: Dict[str, Dict[str, dict]] = {}
+        self._discarded = set()  # in-flight inserts to delete once they have landed
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def insert(self, doc: dict):
+        """Queue a new job document"""
+        self._inserts[doc["job_id"]] = dict(doc)
+        self._maybe_wake()
+
+    def update(self, job_id: str, set_fields: Optional[dict] = None, unset_fields: Optional[list] = None):
+        """Queue field changes for a job, merging with anything still pending"""
+        set_fields = set_fields or {}
+        unset_fields = unset_fields or []
+
+        if job_id in self._inserts:
+            doc = self._inserts[job_id]
+            doc.update(set_fields)
+            for field in unset_fields:
+                doc.pop(field, None)
+            return
+
+        pending = self._updates.setdefault(job_id, {"$set": {}, "$unset": {}})
+        for field, value in set_fields.items():
+            pending["$set"][field] = value
+            pending["$unset"].pop(field, None)
+        for field in unset_fields:
+            pending["$set"].pop(field, None)
+            pending["$unset"][field] = ""
+        self._maybe_wake()
+
+    def discard(self, job_id: str) -> bool:
+        """Drop pending writes for a job; True if it had an insert not yet in the database"""
+        self._updates.pop(job_id, None)
+        self._inflight_updates.pop(job_id, None)
+        if self._inflight_inserts.pop(job_id, None) is not None:
+            # Already on its way; remove it again once the flush has written it
+            self._discarded.add(job_id)
+            self._inserts.pop(job_id, None)
+            return True
+        return self._inserts.pop(job_id, None) is not None
+
+    @staticmethod
+    def _apply(doc: dict, update: Optional[Dict[str, dict]]) -> dict:
+        if update:
+            doc.update(update["$set"])
+            for field in update["$unset"]:
+                doc.pop(field, None)
+        return doc
+
+    def overlay(self, job_id: str, doc: Optional[dict]) -> Optional[dict]:
+        """Apply pending and in-flight writes to a document read from the database"""
+        if job_id in self._inserts:
+            return dict(self._inserts[job_id])
+        if job_id in self._inflight_inserts:
+            doc = self._inflight_inserts[job_id]
+        elif doc is None or (job_id not in self._updates and job_id not in self._inflight_updates):
+            return doc
+        doc = self._apply(dict(doc), self._inflight_updates.get(job_id))
+        return self._apply(doc, self._updates.get(job_id))
+
+    def pending_inserts(self) -> List[dict]:
+        """Job documents not yet (known to be) in the database, with later updates applied"""
+        buffered = [dict(doc) for doc in self._inserts.values()]
+        return buffered + [self.overlay(job_id, None) for job_id in self._inflight_inserts]
+
+    def _maybe_wake(self):
+        if len(self._inserts) + len(self._updates) >= self.max_batch:
+            self._wake.set()
+
+    def _requeue(self, inserts: Dict[str, dict], updates: Dict[str, Dict[str, dict]]):
+        # Put a failed batch back underneath anything queued since
+        for job_id, doc in inserts.items():
+            newer = self._updates.pop(job_id, None)
+            self._inserts[job_id] = doc
+            if newer:
+                self.update(job_id, newer["$set"], list(newer["$unset"]))
+        for job_id, update in updates.items():
+            newer = self._updates.pop(job_id, None)
+            self._updates[job_id] = update
+            if newer:
+                self.update(job_id, newer["$set"], list(newer["$unset"]))
+
+    async def flush(self):
+        """Write everything pending in one bulk_write"""
+        from pymongo import InsertOne, UpdateOne
+        from pymongo.errors import BulkWriteError
+        from pymongo.write_concern import WriteConcern
+
+        async with self._lock:
+            database = get_database()
+            if database is None or not (self._inserts or self._updates):
+                return
+
+            inserts, self._inserts = self._inserts, {}
+            updates, self._updates = self._updates, {}
+            self._inflight_inserts, self._inflight_updates = inserts, updates
+            operations = [InsertOne(doc) for doc in inserts.values()]
+            for job_id, update in updates.items():
+                update = {op: fields for op, fields in update.items() if fields}
+                if update:
+                    operations.append(UpdateOne({"job_id": job_id}, update))
+
+            try:
+                jobs = database.jobs.with_options(write_concern=WriteConcern(**self.write_concern_options))
+                await jobs.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                print(f"Job write batch partially failed: {e.details.get('writeErrors', [])[:3]}")
+            except Exception as e:
+                print(f"Job write batch failed, will retry: {e}")
+                # discard() removes jobs from these dicts, so deleted jobs aren't retried
+                self._requeue(inserts, updates)
+            finally:
+                self._inflight_inserts, self._inflight_updates = {}, {}
+
+            discarded, self._discarded = self._discarded, set()
+            if discarded:
+                try:
+                    await database.jobs.delete_many({"job_id": {"$in": list(discarded)}})
+                except Exception as e:
+                    print(f"Could not remove discarded jobs {sorted(discarded)}: {e}")
+
+    async def flush_if_write_through(self):
+        """Flush immediately when buffering is disabled (JOB_WRITE_INTERVAL_MS=0)"""
+        if self.flush_interval <= 0:
+            await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(self.flush_interval, 0.05))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass  # no loop yet; connect_to_mongo starts it at app startup
+
+    async def close(self):
+        """Stop the flush loop and write out anything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+job_writer = JobWriter()
@@ -0,0 +1,199 @@
+"""
+In-process DNS cache shared by every requests/urllib3 fetch
+
+install() routes urllib3's connection setup through DNS_CACHE, so the scraper,
+crawls and link checks all reuse lookups. Answers are resolved with dnspython
+and kept for their record TTL; hostnames dnspython can't answer (e.g. entries
+in /etc/hosts) fall back to the system resolver with a fixed TTL. Playwright
+runs its own resolver inside the browser and is not covered.
+"""
+import ipaddress
+import os
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.metrics import REGISTRY, Counter, Histogram
+
+DNS_LOOKUPS = REGISTRY.register(Counter("dns_cache_lookups_total", "DNS cache lookups by result"))
+DNS_LOOKUP_SECONDS = REGISTRY.register(Histogram(
+    "dns_lookup_seconds", "Time to resolve a hostname, including cache hits",
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+))
+
+# Lookup time spent by the current thread, for per-page stage timings
+_thread_lookup_time = threading.local()
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def take_lookup_time() -> float:
+    """Seconds this thread spent resolving since the last call"""
+    seconds = getattr(_thread_lookup_time, "seconds", 0.0)
+    _thread_lookup_time.seconds = 0.0
+    return seconds
+
+
+class DNSCache:
+    def __init__(self):
+        self.min_ttl = float(os.getenv("DNS_CACHE_MIN_TTL", "0"))
+        self.max_ttl = float(os.getenv("DNS_CACHE_MAX_TTL", "3600"))
+        self.fallback_ttl = float(os.getenv("DNS_CACHE_FALLBACK_TTL", "60"))
+        self.max_entries = int(os.getenv("DNS_CACHE_MAX_ENTRIES", "10000"))
+        self.timeout = float(os.getenv("DNS_RESOLVE_TIMEOUT", "5"))
+
+        self._entries: Dict[str, Tuple[List[str], float]] = {}  # host -> (addresses, expires_at)
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._resolver = None
+
+    def _clamp(self, ttl: float) -> float:
+        return min(max(ttl, self.min_ttl), self.max_ttl)
+
+    def _store(self, host: str, addresses: List[str], ttl: float):
+        with self._lock:
+            self._entries.pop(host, None)
+            if len(self._entries) >= self.max_entries:
+                # Oldest insertion first; entries are re-inserted on refresh
+                del self._entries[next(iter(self._entries))]
+            self._entries[host] = (addresses, time.monotonic() + self._clamp(ttl))
+            self._host_locks.pop(host, None)
+
+    def _fresh(self, host: str) -> Optional[List[str]]:
+        entry = self._entries.get(host)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def _host_lock(self, host: str) -> threading.Lock:
+        with self._lock:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.Lock()
+            return self._host_locks[host]
+
+    def _query(self, host: str) -> Tuple[List[str], float]:
+        """Resolve with dnspython, then the system resolver; returns (addresses, ttl)"""
+        try:
+            import dns.exception
+            import dns.resolver
+        except ImportError:
+            dns = None
+
+        if dns is not None:
+            if self._resolver is None:
+                self._resolver = dns.resolver.Resolver()
+            # IPv4 first; AAAA only for IPv6-only hosts to keep misses to one query
+            for rdtype in ("A", "AAAA"):
+                try:
+                    answer = self._resolver.resolve(host, rdtype, lifetime=self.timeout)
+                    return [r.address for r in answer], answer.rrset.ttl
+                except dns.exception.DNSException:
+                    continue
+
+        infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos)), self.fallback_ttl
+
+    def resolve(self, host: str) -> List[str]:
+        """Addresses for host, from cache when fresh"""
+        if _is_ip(host):
+            return [host]
+
+        start = time.perf_counter()
+        addresses = self._fresh(host)
+        result = "hit"
+        if addresses is None:
+            # One lookup per host at a time; concurrent callers wait for it
+            with self._host_lock(host):
+                addresses = self._fresh(host)
+                if addresses is None:
+                    result = "miss"
+                    try:
+                        addresses, ttl = self._query(host)
+                        self._store(host, addresses, ttl)
+                    except OSError:
+                        # Serve a stale answer rather than fail outright
+                        entry = self._entries.get(host)
+                        if entry is None:
+                            DNS_LOOKUPS.inc(result="error")
+                            raise
+                        addresses, result = entry[0], "stale"
+
+        elapsed = time.perf_counter() - start
+        DNS_LOOKUPS.inc(result=result)
+        DNS_LOOKUP_SECONDS.observe(elapsed, result=result)
+        _thread_lookup_time.seconds = getattr(_thread_lookup_time, "seconds", 0.0) + elapsed
+        return addresses
+
+    async def resolve_async(self, host: str) -> List[str]:
+        """Resolve without blocking the event loop and populate the cache"""
+        if _is_ip(host) or self._fresh(host) is not None:
+            return self.resolve(host)
+        try:
+            import dns.asyncresolver
+            import dns.exception
+        except ImportError:
+            import asyncio
+            return await asyncio.get_running_loop().run_in_executor(None, self.resolve, host)
+
+        start = time.perf_counter()
+        resolver = dns.asyncresolver.Resolver()
+        for rdtype in ("A", "AAAA"):
+            try:
+                answer = await resolver.resolve(host, rdtype, lifetime=self.timeout)
+            except dns.exception.DNSException:
+                continue
+            addresses = [r.address for r in answer]
+            self._store(host, addresses, answer.rrset.ttl)
+            DNS_LOOKUPS.inc(result="miss")
+            DNS_LOOKUP_SECONDS.observe(time.perf_counter() - start, result="miss")
+            return addresses
+        # Let the blocking path try the system resolver
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(None, self.resolve, host)
+
+    async def prewarm(self, hosts: Iterable[Optional[str]]):
+        """Resolve hosts concurrently ahead of a job; failures are left for the fetch to report"""
+        import asyncio
+        await asyncio.gather(
+            *(self.resolve_async(h) for h in set(hosts) if h),
+            return_exceptions=True
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+DNS_CACHE = DNSCache()
+_installed = False
+
+
+def install():
+    """Route urllib3 (and so requests) connections through DNS_CACHE; idempotent"""
+    global _installed
+    if _installed or os.getenv("DNS_CACHE_ENABLED", "true").lower() != "true":
+        return
+    from urllib3.util import connection
+
+    original = connection.create_connection
+
+    def create_connection(address, *args, **kwargs):
+        host, port = address
+        err = None
+        # TLS SNI and the Host header come from the connection, not this address
+        for ip in DNS_CACHE.resolve(host.strip("[]")):
+            try:
+                return original((ip, port), *args, **kwargs)
+            except OSError as e:
+                err = e
+        raise err or OSError(f"No addresses for {host}")
+
+    connection.create_connection = create_connection
+    _installed = True
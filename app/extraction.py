@@ -0,0 +1,156 @@
+"""
+Declarative extraction schemas
+
+A schema names the fields to pull out of a page and how:
+
+    {
+        "name": "product_list",
+        "fields": [
+            {"name": "heading", "selector": "h1"},
+            {"name": "products", "selector": "li.product", "many": true, "fields": [
+                {"name": "name", "selector": "h3"},
+                {"name": "price", "selector": ".price", "attr": "content", "coerce": "float"},
+                {"name": "url", "selector": "a", "attr": "href", "coerce": "url"}
+            ]}
+        ]
+    }
+
+Each field takes the element's text by default, an attribute with "attr", or
+its markup with "html": true; "many" collects every match instead of the
+first, and nested "fields" turn each match into an object. Schemas are
+compiled once (selectors precompiled with soupsieve) and cached by content,
+and all fields at one level are matched in a single walk of the tree.
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+NUMBER_PATTERN = re.compile(r"-?\d[\d,]*(?:\.\d+)?|-?\.\d+")
+TRUE_VALUES = {"true", "yes", "1", "on", "y"}
+COERCIONS = {"str", "int", "float", "bool", "url"}
+
+
+def _coerce(value: Optional[str], coerce: str, base_url: str) -> Any:
+    if value is None:
+        return None
+    if coerce == "int" or coerce == "float":
+        match = NUMBER_PATTERN.search(value)
+        if not match:
+            return None
+        number = float(match.group().replace(",", ""))
+        return int(number) if coerce == "int" else number
+    if coerce == "bool":
+        return value.strip().lower() in TRUE_VALUES
+    if coerce == "url":
+        return urljoin(base_url, value.strip())
+    return value
+
+
+def _field_specs(fields: Any, path: str) -> List[Dict[str, Any]]:
+    if not isinstance(fields, list) or not all(isinstance(f, dict) for f in fields):
+        raise ValueError(f"{path}: 'fields' must be a list of field objects")
+    return fields
+
+
+class CompiledField:
+    def __init__(self, spec: Dict[str, Any], path: str):
+        if not spec.get("name"):
+            raise ValueError(f"{path}: every field needs a name")
+        self.name = spec["name"]
+        path = f"{path}.{self.name}"
+
+        selector = spec.get("selector")
+        try:
+            # No selector means the current element itself (useful in nested fields)
+            self.selector = soupsieve.compile(selector) if selector else None
+        except Exception as e:
+            raise ValueError(f"{path}: invalid selector {selector!r}: {e}")
+
+        self.many = bool(spec.get("many", False))
+        self.attr = spec.get("attr")
+        self.html = bool(spec.get("html", False))
+        self.default = spec.get("default")
+        self.coerce = spec.get("coerce", "str")
+        if self.coerce not in COERCIONS:
+            raise ValueError(f"{path}: unknown coerce {self.coerce!r}, expected one of {sorted(COERCIONS)}")
+
+        nested = spec.get("fields")
+        self.fields = [CompiledField(f, path) for f in _field_specs(nested, path)] if nested else None
+
+    def value(self, elem: Tag, base_url: str) -> Any:
+        if self.fields is not None:
+            return evaluate(self.fields, elem, base_url)
+        if self.attr:
+            raw = elem.get(self.attr)
+            if isinstance(raw, list):
+                raw = " ".join(raw)
+        elif self.html:
+            raw = elem.decode_contents()
+        else:
+            raw = elem.get_text(" ", strip=True)
+        return _coerce(raw, self.coerce, base_url)
+
+
+def evaluate(fields: List[CompiledField], root: Tag, base_url: str) -> Dict[str, Any]:
+    """Match all fields against root's subtree in one pass"""
+    output: Dict[str, Any] = {}
+    pending = []
+    for field in fields:
+        if field.selector is None:
+            output[field.name] = field.value(root, base_url)
+        else:
+            output[field.name] = [] if field.many else field.default
+            pending.append(field)
+
+    singles_left = sum(1 for f in pending if not f.many)
+    has_many = any(f.many for f in pending)
+    found = set()
+
+    for elem in root.descendants:
+        if not isinstance(elem, Tag):
+            continue
+        for field in pending:
+            if not field.many and field.name in found:
+                continue
+            if field.selector.match(elem):
+                if field.many:
+                    output[field.name].append(field.value(elem, base_url))
+                else:
+                    output[field.name] = field.value(elem, base_url)
+                    found.add(field.name)
+                    singles_left -= 1
+        # Nothing left to find once every single-value field has matched
+        if not has_many and singles_left == 0:
+            break
+
+    return output
+
+
+class ExtractionPlan:
+    """A compiled schema, reusable across pages and jobs"""
+
+    def __init__(self, schema: Dict[str, Any]):
+        fields = schema.get("fields") if isinstance(schema, dict) else None
+        if not fields:
+            raise ValueError("Extraction schema must have a non-empty 'fields' list")
+        self.name = schema.get("name")
+        path = self.name or "schema"
+        self.fields = [CompiledField(f, path) for f in _field_specs(fields, path)]
+
+    def extract(self, soup: BeautifulSoup, base_url: str) -> Dict[str, Any]:
+        return evaluate(self.fields, soup, base_url)
+
+
+@lru_cache(maxsize=128)
+def _compile_cached(key: str) -> ExtractionPlan:
+    return ExtractionPlan(json.loads(key))
+
+
+def compile_schema(schema: Dict[str, Any]) -> ExtractionPlan:
+    """Compile a schema, reusing an earlier compilation of identical content"""
+    return _compile_cached(json.dumps(schema, sort_keys=True))
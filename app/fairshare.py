@@ -0,0 +1,199 @@
+"""
+Fair-share job queue across API clients
+
+Jobs are queued per client (identified by X-API-Key) and started with stride
+scheduling: every start advances the client's pass by the job's cost (pages
+it may fetch) divided by the client's weight, and the client whose next job
+would finish at the lowest pass goes next. A client submitting a 1,000-page crawl therefore waits behind
+others' single pages instead of holding up the queue. Each client also has a
+concurrency cap, a queue length cap and an hourly page budget.
+
+Per-client settings come from CLIENT_QUOTAS, a JSON object keyed by API key:
+
+    {"my-api-key": {"weight": 4, "max_concurrent": 4, "pages_per_hour": 20000}}
+
+Keys are not otherwise authenticated, so only keys listed there get a queue
+of their own. Requests without a listed key share the "anonymous" client,
+which may use every job slot unless CLIENT_QUOTAS["anonymous"] says otherwise.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.metrics import REGISTRY, Counter, Gauge
+
+ANONYMOUS = "anonymous"
+
+JOBS_REJECTED = REGISTRY.register(Counter("scraper_jobs_rejected_total", "Jobs refused by client quotas"))
+
+
+def client_id(api_key: Optional[str]) -> str:
+    """Stable id for an API key that is safe to store and display"""
+    if not api_key:
+        return ANONYMOUS
+    return "key-" + hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+class ClientState:
+    def __init__(self, limits: Dict[str, Any], default_concurrent: Optional[int] = None):
+        if default_concurrent is None:
+            default_concurrent = int(os.getenv("CLIENT_MAX_CONCURRENT", "2"))
+        self.weight = float(limits.get("weight", os.getenv("DEFAULT_CLIENT_WEIGHT", "1")))
+        self.max_concurrent = int(limits.get("max_concurrent", default_concurrent))
+        self.max_queued = int(limits.get("max_queued", os.getenv("CLIENT_MAX_QUEUED", "100")))
+        self.pages_per_hour = int(limits.get("pages_per_hour", os.getenv("CLIENT_PAGES_PER_HOUR", "0")))
+        self.queue = deque()
+        self.running = 0
+        self.pass_value = 0.0
+        self._pages = deque()  # (timestamp, pages) of jobs admitted in the last hour
+
+    def pages_used(self) -> int:
+        cutoff = time.monotonic() - 3600
+        while self._pages and self._pages[0][0] < cutoff:
+            self._pages.popleft()
+        return sum(pages for _, pages in self._pages)
+
+    def record_pages(self, pages: int):
+        self._pages.append((time.monotonic(), pages))
+
+
+class FairShareQueue:
+    def __init__(self):
+        self.workers = int(os.getenv("JOB_WORKERS", "4"))
+        quotas = json.loads(os.getenv("CLIENT_QUOTAS", "{}"))
+        self._limits = {
+            ANONYMOUS if key == ANONYMOUS else client_id(key): limits for key, limits in quotas.items()
+        }
+        self._clients: Dict[str, ClientState] = {}
+        self._entries: Dict[str, tuple] = {}  # job_id -> (client, entry) while queued
+        self._tasks = set()
+        self.running = 0
+
+    def client_for(self, api_key: Optional[str]) -> str:
+        """Client of a request: its key's own if listed in CLIENT_QUOTAS, otherwise anonymous"""
+        client = client_id(api_key)
+        return client if client in self._limits else ANONYMOUS
+
+    def client(self, client: str) -> ClientState:
+        if client not in self._clients:
+            # Interactive users without a key all share anonymous; don't cap it below the workers
+            default_concurrent = self.workers if client == ANONYMOUS else None
+            self._clients[client] = ClientState(self._limits.get(client, {}), default_concurrent)
+        return self._clients[client]
+
+    def admit(self, client: str, cost: int) -> Optional[str]:
+        """Why a job of this cost would be refused right now, or None if it is accepted"""
+        state = self.client(client)
+        if len(state.queue) >= state.max_queued:
+            JOBS_REJECTED.inc(reason="max_queued")
+            return f"Too many queued jobs (limit {state.max_queued})"
+        remaining = state.pages_per_hour - state.pages_used()
+        if state.pages_per_hour and cost > remaining:
+            JOBS_REJECTED.inc(reason="page_budget")
+            return f"Hourly page budget exceeded: job may fetch {cost} pages, {max(remaining, 0)} of {state.pages_per_hour} left"
+        return None
+
+    def submit(self, client: str, job_id: str, cost: int, run_kwargs: Dict[str, Any]) -> asyncio.Future:
+        """Queue a job; the returned future resolves once it has finished running"""
+        state = self.client(client)
+        if not state.queue and not state.running:
+            # A returning client starts level with the others instead of spending banked credit
+            active = [c.pass_value for c in self._clients.values() if c.queue or c.running]
+            state.pass_value = max(state.pass_value, min(active, default=state.pass_value))
+        state.record_pages(cost)
+
+        done = asyncio.get_running_loop().create_future()
+        entry = {"job_id": job_id, "cost": max(cost, 1), "kwargs": run_kwargs, "done": done}
+        state.queue.append(entry)
+        self._entries[job_id] = (client, entry)
+        self._dispatch()
+        return done
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that hasn't started yet"""
+        queued = self._entries.pop(job_id, None)
+        if queued is None:
+            return False
+        client, entry = queued
+        self._clients[client].queue.remove(entry)
+        entry["done"].cancel()
+        return True
+
+    def _dispatch(self):
+        while self.running < self.workers:
+            eligible = [c for c in self._clients.values() if c.queue and c.running < c.max_concurrent]
+            if not eligible:
+                return
+            state = min(eligible, key=lambda c: c.pass_value + c.queue[0]["cost"] / c.weight)
+            entry = state.queue.popleft()
+            self._entries.pop(entry["job_id"], None)
+            state.pass_value += entry["cost"] / state.weight
+            state.running += 1
+            self.running += 1
+            # The loop only keeps weak references to tasks
+            task = asyncio.get_running_loop().create_task(self._run(state, entry))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, state: ClientState, entry: Dict[str, Any]):
+        from app.routes import run_scrape_job_bg
+
+        try:
+            await run_scrape_job_bg(**entry["kwargs"])
+        except Exception as e:
+            print(f"Job {entry['job_id']} failed outside its run: {e}")
+        finally:
+            state.running -= 1
+            self.running -= 1
+            if not entry["done"].done():
+                entry["done"].set_result(None)
+            self._dispatch()
+
+    def position(self, job_id: str) -> Optional[Dict[str, int]]:
+        """
+        Estimated place of a queued job: overall, and within its client's queue
+
+        The overall position replays the scheduling order over what is queued
+        now, ignoring concurrency caps, so it is an estimate.
+        """
+        queued = self._entries.get(job_id)
+        if queued is None:
+            return None
+        client, entry = queued
+        passes = {name: c.pass_value for name, c in self._clients.items() if c.queue}
+        pending = {name: list(self._clients[name].queue) for name in passes}
+        overall = 0
+        while passes:
+            name = min(passes, key=lambda n: passes[n] + pending[n][0]["cost"] / self._clients[n].weight)
+            next_entry = pending[name].pop(0)
+            overall += 1
+            if next_entry is entry:
+                break
+            passes[name] += next_entry["cost"] / self._clients[name].weight
+            if not pending[name]:
+                del passes[name]
+        return {
+            "queue_position": overall,
+            "client_queue_position": self._clients[client].queue.index(entry) + 1,
+        }
+
+    def usage(self, client: str) -> Dict[str, Any]:
+        state = self.client(client)
+        return {
+            "client_id": client,
+            "weight": state.weight,
+            "running": state.running,
+            "queued": len(state.queue),
+            "max_concurrent": state.max_concurrent,
+            "max_queued": state.max_queued,
+            "pages_used_last_hour": state.pages_used(),
+            "pages_per_hour": state.pages_per_hour or None,
+        }
+
+
+job_queue = FairShareQueue()
+REGISTRY.register(Gauge("scraper_job_workers_busy", "Job slots in use by the fair-share queue", fn=lambda: job_queue.running))
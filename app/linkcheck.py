@@ -0,0 +1,121 @@
+"""
+Concurrent link health checks for scraped links and images
+
+URLs are checked with HEAD, falling back to a one-byte ranged GET for servers
+that reject HEAD. Checks run on a thread pool with a cap on concurrent
+requests per host, and each URL's status is cached for a TTL so crawls and
+repeat jobs don't re-check the same targets.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.metrics import REGISTRY, Counter
+
+LINK_CHECKS = REGISTRY.register(Counter("link_checks_total", "Link checks by outcome"))
+
+# Statuses from servers that don't implement HEAD properly
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+
+
+class LinkChecker:
+    def __init__(self, headers: Optional[Dict[str, str]] = None):
+        self.max_workers = int(os.getenv("LINK_CHECK_WORKERS", "32"))
+        self.per_host = int(os.getenv("LINK_CHECK_PER_HOST", "4"))
+        self.ttl = float(os.getenv("LINK_CHECK_TTL_SECONDS", "3600"))
+        self.timeout = float(os.getenv("LINK_CHECK_TIMEOUT", "10"))
+        self.max_urls = int(os.getenv("LINK_CHECK_MAX_URLS", "2000"))
+        self.headers = headers or {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache: Dict[str, tuple] = {}  # url -> (result, expires_at)
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _cached(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(url)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def _request(self, url: str) -> Dict[str, Any]:
+        response = self.session.head(url, headers=self.headers, timeout=self.timeout, allow_redirects=True)
+        method = "HEAD"
+        if response.status_code in HEAD_FALLBACK_STATUSES:
+            response = self.session.get(
+                url,
+                headers={**self.headers, "Range": "bytes=0-0"},
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True
+            )
+            response.close()
+            method = "GET"
+        return {"url": url, "status": response.status_code, "ok": response.status_code < 400, "method": method}
+
+    def check_one(self, url: str) -> Dict[str, Any]:
+        cached = self._cached(url)
+        if cached is not None:
+            LINK_CHECKS.inc(result="cached")
+            return cached
+
+        with self._slot(urlparse(url).netloc):
+            try:
+                result = self._request(url)
+            except requests.exceptions.RequestException as e:
+                result = {"url": url, "status": None, "ok": False, "error": type(e).__name__}
+
+        LINK_CHECKS.inc(result="ok" if result["ok"] else "broken")
+        with self._lock:
+            self._cache[url] = (result, time.monotonic() + self.ttl)
+        return result
+
+    def _interleave_hosts(self, urls: List[str]) -> List[str]:
+        # Round-robin across hosts so workers aren't all parked on one host's limit
+        by_host: Dict[str, List[str]] = {}
+        for url in urls:
+            by_host.setdefault(urlparse(url).netloc, []).append(url)
+        return [url for group in zip_longest(*by_host.values()) for url in group if url]
+
+    def check(self, urls: Iterable[str]) -> Dict[str, Any]:
+        """Check a batch of URLs; returns counts and details of broken ones"""
+        self.prune()
+        unique = list(dict.fromkeys(u for u in urls if u and urlparse(u).scheme in ("http", "https")))
+        skipped = max(0, len(unique) - self.max_urls)
+        targets = self._interleave_hosts(unique[:self.max_urls])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets)) or 1) as pool:
+            results = list(pool.map(self.check_one, targets))
+
+        broken = [r for r in results if not r["ok"]]
+        return {
+            "checked": len(results),
+            "ok": len(results) - len(broken),
+            "broken_count": len(broken),
+            "broken": broken,
+            "skipped": skipped,
+        }
+
+    def prune(self):
+        """Drop expired cache entries"""
+        now = time.monotonic()
+        with self._lock:
+            for url in [u for u, (_, expires) in self._cache.items() if expires <= now]:
+                del self._cache[url]
@@ -1,11 +1,13 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
 
 from app.routes import router
+from app.metrics import REGISTRY
+from app.compression import CompressionMiddleware, FastJSONResponse
 
 # Load environment variables
 load_dotenv()
@@ -13,23 +15,35 @@ load_dotenv()
 app = FastAPI(
     title="Web Scraper API",
     description="A modern web scraping API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 from app.database import connect_to_mongo, close_mongo_connection
 
 @app.on_event("startup")
 async def startup_db_client():
-    await connect_to_mongo()
+    # On serverless the client is created by the first request that needs it
+    if not os.getenv("VERCEL"):
+        await connect_to_mongo()
+
+    from app.scheduler import SCHEDULER_ENABLED, scheduler
+    if SCHEDULER_ENABLED:
+        scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    from app.scheduler import scheduler
+    await scheduler.stop()
     await close_mongo_connection()
 
 # CORS middleware
 # Get allowed origins from environment or use wildcard for development
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",") if os.getenv("ALLOWED_ORIGINS") else ["*"]
 
+# Negotiated brotli/gzip compression of API responses
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -41,6 +55,11 @@ app.add_middleware(
 # Include API routes
 app.include_router(router, prefix="/api", tags=["scraper"])
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Serve React build files
 react_build_dir = os.path.join(os.path.dirname(__file__), "..", "frontend", "build")
 if os.path.exists(react_build_dir):
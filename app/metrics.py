@@ -0,0 +1,213 @@
+"""
+In-process metrics with Prometheus text exposition
+
+Scraper code records per-stage timings through StageTimer; counters, gauges and
+histograms are aggregated in REGISTRY and rendered by the /metrics endpoint.
+If OpenTelemetry is installed, each stage is also emitted as a tracing span.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Optional tracing support
+try:
+    from opentelemetry import trace
+    tracer = trace.get_tracer("webscraper")
+except ImportError:
+    tracer = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(Metric):
+    """Gauge set directly, or computed at scrape time when fn is given"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation)
+        self._values: Dict[tuple, float] = {}
+        self._fn = fn
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        if self._fn is not None:
+            return [f"{self.name} {self._fn()}"]
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in self._series.items():
+                for i, bound in enumerate(self.buckets):
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(key, le)} {series[i]}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class RateWindow:
+    """Events per second over a sliding time window"""
+
+    def __init__(self, window_seconds: float = 60.0):
+        self.window = window_seconds
+        self._events = deque()
+        self._lock = threading.Lock()
+
+    def mark(self):
+        with self._lock:
+            self._events.append(time.monotonic())
+
+    def rate(self) -> float:
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            while self._events and self._events[0] < cutoff:
+                self._events.popleft()
+            return round(len(self._events) / self.window, 3)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram("scraper_stage_seconds", "Time spent in each scraping stage"))
+PAGE_SECONDS = REGISTRY.register(Histogram("scraper_page_seconds", "Total time to scrape one page"))
+PAGES_TOTAL = REGISTRY.register(Counter("scraper_pages_total", "Pages scraped"))
+BYTES_FETCHED = REGISTRY.register(Counter("scraper_bytes_fetched_total", "Response body bytes downloaded"))
+ERRORS_TOTAL = REGISTRY.register(Counter("scraper_errors_total", "Scraping errors by exception type"))
+JOB_SECONDS = REGISTRY.register(Histogram("scraper_job_duration_seconds", "Job duration by final status"))
+JOBS_QUEUED = REGISTRY.register(Gauge("scraper_jobs_queued", "Jobs accepted but not yet started"))
+JOBS_QUEUED.set(0)
+
+PAGE_RATE = RateWindow()
+REGISTRY.register(Gauge("scraper_pages_per_second", "Pages scraped per second over the last minute", fn=PAGE_RATE.rate))
+
+
+class StageTimer:
+    """Per-page stage timer; results are attached to the scrape result"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        span = tracer.start_as_current_span(f"scrape.{name}") if tracer else None
+        if span:
+            span.__enter__()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if span:
+                span.__exit__(None, None, None)
+            self.record(name, elapsed)
+
+    def record(self, name: str, seconds: float):
+        """Record a stage measured elsewhere"""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, stage=name)
+
+    def finish(self, mode: str) -> Dict[str, float]:
+        """Close out the page: update page counters and return timings in ms"""
+        total = time.perf_counter() - self._start
+        PAGE_SECONDS.observe(total, mode=mode)
+        PAGES_TOTAL.inc(mode=mode)
+        PAGE_RATE.mark()
+        timings = {name: round(seconds * 1000, 2) for name, seconds in self.timings.items()}
+        timings["total"] = round(total * 1000, 2)
+        return timings
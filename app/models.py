@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -11,13 +11,46 @@ class ScrapeJobStatus(str, Enum):
     FAILED = "failed"
 
 
+class RenderMode(str, Enum):
+    STATIC = "static"
+    PLAYWRIGHT = "playwright"
+    AUTO = "auto"  # Static first, Playwright only for pages that need JavaScript
+
+
 class ScrapeRequest(BaseModel):
     url: str  # Can be domain or full URL
     selectors: Optional[List[str]] = None  # CSS selectors
     use_playwright: bool = False  # Use Playwright for JS-heavy sites
+    render_mode: Optional[RenderMode] = None  # Overrides use_playwright when set
     wait_time: Optional[int] = 5  # Wait time for Playwright (seconds)
     crawl_site: bool = False  # If True and domain provided, crawl entire site
     max_pages: Optional[int] = 10  # Maximum pages to crawl
+    profile: bool = False  # Capture a CPU profile and allocation snapshot of the job
+    extraction_schema: Optional[Dict[str, Any]] = None  # Inline extraction schema (see app/extraction.py)
+    schema_name: Optional[str] = None  # Name of a saved extraction schema
+    check_links: bool = False  # Check scraped links and images for broken targets
+    archive: bool = False  # Keep raw responses in a WARC archive for later re-extraction
+
+
+class ReextractRequest(BaseModel):
+    # Anything left unset is taken from the archived job
+    selectors: Optional[List[str]] = None
+    extraction_schema: Optional[Dict[str, Any]] = None
+    schema_name: Optional[str] = None
+
+
+class ScheduleRequest(BaseModel):
+    request: ScrapeRequest  # Scrape to run on every occurrence
+    interval_seconds: int = Field(3600, ge=60)  # e.g. 3600 hourly, 86400 daily
+    jitter_seconds: Optional[int] = Field(None, ge=0)  # Random delay per run (default: 10% of interval, max 300)
+    name: Optional[str] = None
+    enabled: bool = True
+
+
+class ExtractionSchema(BaseModel):
+    name: str
+    description: Optional[str] = None
+    fields: List[Dict[str, Any]]
 
 
 class ScrapeResult(BaseModel):
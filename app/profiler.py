@@ -0,0 +1,152 @@
+"""
+Sampling profiler for scrape jobs
+
+A background thread samples the stack of the thread running the scrape at a
+fixed interval, which keeps overhead low enough to leave on for every job when
+slow-job profiling is enabled. Optionally a tracemalloc snapshot of the largest
+allocation sites is taken as well.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> Optional[tracemalloc.Snapshot]:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+    return snapshot
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Collects stack samples of one thread"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005, trace_allocations: bool = False,
+                 root_frame=None):
+        self.thread_id = thread_id
+        self.root_frame = root_frame  # frames at and above this one are left out of stacks
+        self.interval = interval
+        self.trace_allocations = trace_allocations
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._snapshot = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self._duration = 0.0
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and frame is not self.root_frame:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        if self.trace_allocations:
+            _start_tracemalloc()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="job-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._duration = time.perf_counter() - self._started_at
+        if self.trace_allocations:
+            self._snapshot = _stop_tracemalloc()
+
+    def _function_counts(self) -> Tuple[Counter, Counter]:
+        self_counts, total_counts = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for name in set(frames):
+                total_counts[name] += count
+        return self_counts, total_counts
+
+    def _top_allocations(self, limit: int = 25) -> List[Dict[str, Any]]:
+        if self._snapshot is None:
+            return []
+        stats = self._snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]).statistics("lineno")
+        return [
+            {
+                "location": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def report(self, limit: int = 25) -> Dict[str, Any]:
+        """Profile summary; 'collapsed' is in flamegraph.pl / speedscope format"""
+        self_counts, total_counts = self._function_counts()
+        # Derive time per sample from wall time: the sampler oversleeps under load
+        to_ms = self._duration * 1000 / self.samples if self.samples else self.interval * 1000
+        return {
+            "interval_ms": round(self.interval * 1000, 2),
+            "samples": self.samples,
+            "duration_seconds": round(self._duration, 3),
+            "top_self": [
+                {"function": name, "samples": n, "approx_ms": round(n * to_ms, 1)}
+                for name, n in self_counts.most_common(limit)
+            ],
+            "top_cumulative": [
+                {"function": name, "samples": n, "approx_ms": round(n * to_ms, 1)}
+                for name, n in total_counts.most_common(limit)
+            ],
+            "allocations": self._top_allocations(limit),
+            "collapsed": "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common()),
+        }
+
+
+def profile_call(fn: Callable[[], Any], interval: float = 0.005,
+                 trace_allocations: bool = False) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run fn in the current thread while sampling it
+
+    Returns:
+        Tuple of (fn result, profile report). If fn raises, the exception
+        propagates with the report attached as its `profile` attribute.
+    """
+    profiler = SamplingProfiler(threading.get_ident(), interval, trace_allocations, root_frame=sys._getframe())
+    profiler.start()
+    try:
+        result = fn()
+    except Exception as e:
+        profiler.stop()
+        e.profile = profiler.report()
+        raise
+    profiler.stop()
+    return result, profiler.report()
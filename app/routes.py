@@ -1,21 +1,67 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from typing import List, Optional
+import asyncio
 import uuid
 from datetime import datetime, timedelta
-import json
 import os
 import csv
 import io
 from collections import defaultdict
-from bson import ObjectId
 
-from app.models import ScrapeRequest, ScrapeResult, ScrapeJobStatus, AnalyticsResponse
-from app.scraper import WebScraper
-from app.database import get_database
+from app.models import ScrapeRequest, ScrapeResult, ScrapeJobStatus, AnalyticsResponse, ExtractionSchema, ScheduleRequest, ReextractRequest
+from app.database import get_database, job_writer
+from app.cache import result_cache
+from app.compression import dumps, pack_result_data, unpack_result_data_async
+from app.metrics import REGISTRY, Gauge, JOBS_QUEUED, JOB_SECONDS
+from app.profiler import profile_call
+from app.search import index_job, remove_job, search_pages
+from app.archive import archive_dir_writable, archive_path
+from app.fairshare import job_queue
 
 router = APIRouter()
-scraper = WebScraper()
+_scraper = None
+
+def get_scraper():
+    """Shared WebScraper, imported on first use to keep cold starts light"""
+    global _scraper
+    if _scraper is None:
+        from app.scraper import WebScraper
+        _scraper = WebScraper()
+    return _scraper
+
+# Jobs running longer than this get their CPU profile stored (0 disables)
+PROFILE_SLOW_JOB_SECONDS = float(os.getenv("PROFILE_SLOW_JOB_SECONDS", "0"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+
+# Jobs currently executing in this process; anything else marked RUNNING in the
+# database was orphaned by a restart and may be resumed
+active_jobs = set()
+REGISTRY.register(Gauge("scraper_jobs_running", "Jobs currently executing in this process", fn=lambda: len(active_jobs)))
+
+async def find_job(db, job_id: str):
+    """Fetch a job document including writes still buffered in job_writer"""
+    job = result_cache.get(job_id)
+    if job is not None:
+        return job
+
+    job = job_writer.overlay(job_id, await db.jobs.find_one({"job_id": job_id}))
+    size = None
+    if job and job.get("result"):
+        # Copy rather than mutate: the document may be a buffered write
+        result = job["result"]
+        data = result.get("data")
+        # Recorded when the job completed; compressed blobs also carry it
+        size = result.get("size_bytes") or (data.get("size") if isinstance(data, dict) else None)
+        job = dict(job, result=dict(result, data=await unpack_result_data_async(data)))
+    # Completed jobs are immutable until deleted
+    if job and job["status"] == ScrapeJobStatus.COMPLETED:
+        result_cache.put(job_id, job, size)
+    return job
+
+async def job_exists(db, job_id: str) -> bool:
+    doc = await db.jobs.find_one({"job_id": job_id}, {"job_id": 1})
+    return job_writer.overlay(job_id, doc) is not None
 
 def serialize_doc(doc):
     """Convert MongoDB document to JSON serializable dict"""
@@ -24,113 +70,323 @@ def serialize_doc(doc):
     doc["_id"] = str(doc["_id"])
     return doc
 
+def validate_schema(schema: dict):
+    """Compile an extraction schema, turning schema errors into a 400"""
+    from app.extraction import compile_schema
+
+    try:
+        compile_schema(schema)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid extraction schema: {e}")
+
+async def save_profile(db, job_id: str, report: Optional[dict], requested: bool, duration: float) -> bool:
+    """Store a job's profile if it was requested or the job was slow"""
+    if not report:
+        return False
+    slow = PROFILE_SLOW_JOB_SECONDS > 0 and duration >= PROFILE_SLOW_JOB_SECONDS
+    if not (requested or slow):
+        return False
+
+    await db.profiles.replace_one(
+        {"job_id": job_id},
+        {
+            "job_id": job_id,
+            "reason": "requested" if requested else "slow_job",
+            "job_duration_seconds": duration,
+            "created_at": datetime.now().isoformat(),
+            **report
+        },
+        upsert=True
+    )
+    return True
+
+_checkpoint_index_ready = False
+
+async def store_checkpoint(db, job_id: str, state: dict, previous=None):
+    """Append a crawl checkpoint's new pages, then move the job's frontier up to them"""
+    global _checkpoint_index_ready
+    if previous is not None:
+        # Checkpoints must land in order; the previous one has logged its own failure
+        await asyncio.wrap_future(previous)
+    new_pages = state.pop("new_pages", [])
+    first = state["pages_saved"] - len(new_pages)
+    try:
+        if not _checkpoint_index_ready:
+            await db.checkpoint_pages.create_index([("job_id", 1), ("seq", 1)])
+            _checkpoint_index_ready = True
+        if new_pages:
+            await db.checkpoint_pages.insert_many(
+                [{"job_id": job_id, "seq": first + i, "page": page} for i, page in enumerate(new_pages)],
+                ordered=False
+            )
+    except Exception as e:
+        # The previous frontier stays in place, so a resume repeats these pages
+        print(f"Checkpoint for job {job_id} failed: {e}")
+        return
+    job_writer.update(job_id, {"checkpoint": state})
+
+async def load_checkpoint(db, job_id: str, checkpoint: dict) -> dict:
+    """A job's checkpoint with its crawled pages, as _crawl_site resumes from it"""
+    if "pages_saved" not in checkpoint:
+        return checkpoint
+    # Pages written after the last frontier that landed are crawled again
+    await db.checkpoint_pages.delete_many({"job_id": job_id, "seq": {"$gte": checkpoint["pages_saved"]}})
+    cursor = db.checkpoint_pages.find({"job_id": job_id}).sort("seq", 1)
+    pages = [doc["page"] for doc in await cursor.to_list(length=None)]
+    return dict(checkpoint, pages=pages)
+
 async def run_scrape_job_bg(job_id: str, url: str, selectors: List[str] = None, 
                             use_playwright: bool = False, wait_time: int = 5,
-                            crawl_site: bool = False, max_pages: int = 10):
+                            crawl_site: bool = False, max_pages: int = 10,
+                            resume_state: dict = None, profile: bool = False,
+                            extraction_schema: dict = None, check_links: bool = False,
+                            render_mode: str = None, archive: bool = False,
+                            replay_archive: str = None):
     """Async background task to run scrape job - updated for MongoDB"""
-    import asyncio
-    
+    JOBS_QUEUED.dec()
     db = get_database()
     if db is None:
         # If db connection failed, we can't do much
         return
 
+    loop = asyncio.get_event_loop()
+    profile_report = None
+
+    checkpoints = []  # checkpoint writes in flight, in crawl order
+
+    def save_checkpoint(state):
+        # Called from the executor thread; hand the write back to the event loop
+        state["updated_at"] = datetime.now().isoformat()
+        previous = checkpoints[-1] if checkpoints else None
+        checkpoints.append(asyncio.run_coroutine_threadsafe(store_checkpoint(db, job_id, state, previous), loop))
+
+    async def checkpoints_written():
+        # The final status must be queued after every checkpoint update
+        if checkpoints:
+            await asyncio.wrap_future(checkpoints[-1])
+
+    writer = None
+    active_jobs.add(job_id)
+    start_time = datetime.now()
     try:
+        if archive:
+            from app.archive import WarcWriter
+            writer = WarcWriter(archive_path(job_id))
+
         # Update status to running
-        await db.jobs.update_one(
-            {"job_id": job_id},
-            {"$set": {"status": ScrapeJobStatus.RUNNING}}
-        )
-        
-        start_time = datetime.now()
+        job_writer.update(job_id, {"status": ScrapeJobStatus.RUNNING})
+        await job_writer.flush_if_write_through()
+
+        from urllib.parse import urlparse
+        target = urlparse(url if "://" in url else f"https://{url}")
+        if not replay_archive:
+            # Resolve the target host off the event loop before the blocking scrape
+            from app.dnscache import DNS_CACHE
+            await DNS_CACHE.prewarm([target.hostname])
         
-        # Run blocking scraper in executor to avoid blocking event loop
-        loop = asyncio.get_event_loop()
-        result_data = await loop.run_in_executor(
-            None, 
-            lambda: scraper.scrape(
+        def scrape():
+            if replay_archive:
+                from app.archive import reextract
+                return reextract(
+                    replay_archive, selectors, extraction_schema,
+                    crawl=crawl_site and target.path in ["", "/"]
+                )
+            return get_scraper().scrape(
                 url=url,
                 selectors=selectors,
                 use_playwright=use_playwright,
                 wait_time=wait_time,
                 crawl_site=crawl_site,
-                max_pages=max_pages
+                max_pages=max_pages,
+                resume_state=resume_state,
+                checkpoint=save_checkpoint,
+                extraction_schema=extraction_schema,
+                check_links=check_links,
+                render_mode=render_mode,
+                archive=writer
             )
-        )
+
+        def run_scrape():
+            result_data = scrape()
+            # Packing serializes and compresses the whole result; keep it off the event loop
+            return result_data, pack_result_data(result_data)
+
+        # Run blocking scraper in executor to avoid blocking event loop.
+        # Slow-job profiling samples every job but only keeps slow ones;
+        # allocation tracing is too costly for that and is opt-in only.
+        if profile or PROFILE_SLOW_JOB_SECONDS > 0:
+            (result_data, (packed_data, result_size)), profile_report = await loop.run_in_executor(
+                None,
+                lambda: profile_call(run_scrape, PROFILE_SAMPLE_INTERVAL, trace_allocations=profile)
+            )
+        else:
+            result_data, (packed_data, result_size) = await loop.run_in_executor(None, run_scrape)
+        await checkpoints_written()
         
         completed_at = datetime.now()
         duration = (completed_at - start_time).total_seconds()
+        JOB_SECONDS.observe(duration, status="completed")
+        has_profile = await save_profile(db, job_id, profile_report, profile, duration)
         
         result_record = {
             "job_id": job_id,
             "url": url,
             "status": ScrapeJobStatus.COMPLETED,
-            "data": result_data,
+            "data": packed_data,
+            "size_bytes": result_size,
             "error": None,
             "completed_at": completed_at.isoformat(),
             "duration_seconds": duration
         }
         
-        # Update job
-        await db.jobs.update_one(
-            {"job_id": job_id},
-            {"$set": {
+        # Update job; queued after the checkpoint updates, so those are superseded
+        job_writer.update(
+            job_id,
+            {
                 "status": ScrapeJobStatus.COMPLETED,
                 "completed_at": completed_at.isoformat(),
                 "duration_seconds": duration,
+                "has_profile": has_profile,
                 "result": result_record
-            }}
+            },
+            unset_fields=["checkpoint"]
         )
+        if crawl_site:
+            try:
+                await db.checkpoint_pages.delete_many({"job_id": job_id})
+            except Exception as e:
+                print(f"Could not remove checkpoint pages of job {job_id}: {e}")
+
+        try:
+            # Jobs deleted while running must not reappear in search results
+            if await job_exists(db, job_id):
+                await index_job(db, job_id, result_data, completed_at.isoformat())
+                if not await job_exists(db, job_id):
+                    # Deleted while indexing, after delete_job cleared search_pages
+                    await remove_job(db, job_id)
+        except Exception as e:
+            # The job itself succeeded; it can be picked up by /search/reindex
+            print(f"Search indexing failed for job {job_id}: {e}")
         
     except Exception as e:
+        await checkpoints_written()
         completed_at = datetime.now()
         error_msg = str(e)
+        duration = (completed_at - start_time).total_seconds()
+        JOB_SECONDS.observe(duration, status="failed")
+        has_profile = await save_profile(db, job_id, getattr(e, "profile", None), profile, duration)
         
-        await db.jobs.update_one(
-            {"job_id": job_id},
-            {"$set": {
-                "status": ScrapeJobStatus.FAILED,
-                "error": error_msg,
-                "completed_at": completed_at.isoformat()
-            }}
-        )
+        job_writer.update(job_id, {
+            "status": ScrapeJobStatus.FAILED,
+            "error": error_msg,
+            "completed_at": completed_at.isoformat(),
+            "has_profile": has_profile
+        })
+    finally:
+        if writer is not None:
+            writer.close()
+        await job_writer.flush_if_write_through()
+        active_jobs.discard(job_id)
 
-@router.post("/scrape", response_model=dict)
-async def create_scrape_job(request: ScrapeRequest, background_tasks: BackgroundTasks):
-    """Create a new scraping job"""
+def get_client(request: Request) -> str:
+    """Fair-share client of the caller, from its X-API-Key header"""
+    return job_queue.client_for(request.headers.get("X-API-Key"))
+
+def job_cost(job: dict) -> int:
+    """Pages a job may fetch, which is what it is charged against its client's share"""
+    return (job.get("max_pages") or 10) if job.get("crawl_site") else 1
+
+def admit_job(client: str, cost: int):
+    reason = job_queue.admit(client, cost)
+    if reason:
+        raise HTTPException(status_code=429, detail=reason)
+
+async def wait_for_job(done: asyncio.Future):
+    # Runs as a background task so the request lifetime still covers the job (serverless)
+    try:
+        await done
+    except asyncio.CancelledError:
+        pass
+
+def enqueue_job(job: dict, client: str, cost: Optional[int] = None, **run_kwargs) -> asyncio.Future:
+    """Hand a created job to the fair-share queue; resolves when it has run"""
+    cost = job_cost(job) if cost is None else cost
+    return job_queue.submit(client, job["job_id"], cost, dict(job_run_kwargs(job), **run_kwargs))
+
+def job_run_kwargs(job: dict) -> dict:
+    """run_scrape_job_bg arguments for a job document"""
+    return dict(
+        job_id=job["job_id"],
+        url=job["url"],
+        selectors=job.get("selectors"),
+        use_playwright=job.get("use_playwright", False),
+        wait_time=job.get("wait_time") or 5,
+        crawl_site=job.get("crawl_site", False),
+        max_pages=job.get("max_pages") or 10,
+        profile=job.get("profile", False),
+        extraction_schema=job.get("extraction_schema"),
+        check_links=job.get("check_links", False),
+        render_mode=job.get("render_mode"),
+        archive=job.get("archive", False),
+        replay_archive=job.get("replay_archive")
+    )
+
+async def create_job(request: ScrapeRequest, extra_fields: Optional[dict] = None) -> dict:
+    """Validate a scrape request and store it as a pending job; the caller starts it"""
     job_id = str(uuid.uuid4())
     db = get_database()
+
+    extraction_schema = request.extraction_schema
+    if request.schema_name:
+        if db is None:
+            raise HTTPException(status_code=503, detail="Database unavailable")
+        saved = await db.schemas.find_one({"name": request.schema_name}, {"_id": 0})
+        if not saved:
+            raise HTTPException(status_code=404, detail="Extraction schema not found")
+        extraction_schema = saved
+    if extraction_schema:
+        validate_schema(extraction_schema)
+    if request.archive and not archive_dir_writable():
+        raise HTTPException(status_code=400, detail="Archiving is unavailable: the archive directory (ARCHIVE_DIR) is not writable")
     
     job = {
         "job_id": job_id,
         "url": request.url,
         "selectors": request.selectors,
         "use_playwright": request.use_playwright,
+        "render_mode": request.render_mode,
         "wait_time": request.wait_time,
         "crawl_site": request.crawl_site,
         "max_pages": request.max_pages or 10,
+        "profile": request.profile,
+        "extraction_schema": extraction_schema,
+        "check_links": request.check_links,
+        "archive": request.archive,
         "status": ScrapeJobStatus.PENDING,
         "created_at": datetime.now().isoformat()
     }
+    job.update(extra_fields or {})
     
     if db is not None:
-        await db.jobs.insert_one(job.copy())
+        job_writer.insert(job)
+        await job_writer.flush_if_write_through()
+    JOBS_QUEUED.inc()
+    return job
+
+@router.post("/scrape", response_model=dict)
+async def create_scrape_job(request: ScrapeRequest, background_tasks: BackgroundTasks,
+                            client: str = Depends(get_client)):
+    """Create a new scraping job"""
+    admit_job(client, job_cost({"crawl_site": request.crawl_site, "max_pages": request.max_pages}))
+    job = await create_job(request, extra_fields={"client_id": client})
     
-    # Add background task
-    background_tasks.add_task(
-        run_scrape_job_bg,
-        job_id=job_id,
-        url=request.url,
-        selectors=request.selectors,
-        use_playwright=request.use_playwright,
-        wait_time=request.wait_time or 5,
-        crawl_site=request.crawl_site,
-        max_pages=request.max_pages or 10
-    )
+    # Queue it behind other clients' work according to their shares
+    background_tasks.add_task(wait_for_job, enqueue_job(job, client))
     
     return {
-        "job_id": job_id,
+        "job_id": job["job_id"],
         "status": "pending",
+        **(job_queue.position(job["job_id"]) or {"queue_position": None, "client_queue_position": None}),
         "message": "Scraping job created successfully"
     }
 
@@ -141,7 +397,7 @@ async def get_result(job_id: str):
     if db is None:
         raise HTTPException(status_code=503, detail="Database unavailable")
         
-    job = await db.jobs.find_one({"job_id": job_id})
+    job = await find_job(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -176,7 +432,13 @@ async def list_jobs(
         query["status"] = status
         
     cursor = db.jobs.find(query).sort("created_at", -1).skip(offset).limit(limit)
-    jobs = await cursor.to_list(length=limit)
+    jobs = [job_writer.overlay(j["job_id"], j) for j in await cursor.to_list(length=limit)]
+
+    # Jobs created in the last flush interval aren't in the database yet
+    if offset == 0:
+        buffered = [j for j in job_writer.pending_inserts() if not status or j["status"] == status]
+        jobs = sorted(buffered, key=lambda j: j["created_at"], reverse=True) + jobs
+        jobs = jobs[:limit]
     
     return [
         {
@@ -197,7 +459,7 @@ async def get_job(job_id: str):
     if db is None:
         raise HTTPException(status_code=503, detail="Database unavailable")
         
-    job = await db.jobs.find_one({"job_id": job_id})
+    job = await find_job(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
         
@@ -212,7 +474,87 @@ async def get_job(job_id: str):
         "error": job.get("error"),
         "created_at": job["created_at"],
         "completed_at": job.get("completed_at"),
-        "duration_seconds": job.get("duration_seconds")
+        "duration_seconds": job.get("duration_seconds"),
+        "has_profile": job.get("has_profile", False),
+        "client_id": job.get("client_id"),
+        **(job_queue.position(job_id) or {"queue_position": None, "client_queue_position": None})
+    }
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_job(job_id: str, background_tasks: BackgroundTasks, client: str = Depends(get_client)):
+    """Resume an interrupted or failed job from its last crawl checkpoint"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    job = await find_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job_id in active_jobs:
+        raise HTTPException(status_code=409, detail="Job is already running")
+    if job_queue.position(job_id) is not None:
+        raise HTTPException(status_code=409, detail="Job is already queued")
+    if job["status"] == ScrapeJobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Job already completed")
+
+    checkpoint = job.get("checkpoint")
+    if checkpoint:
+        checkpoint = await load_checkpoint(db, job_id, checkpoint)
+    pages_done = len(checkpoint.get("pages", [])) if checkpoint else 0
+    # Only the pages still to fetch count against the client's budget
+    cost = max(job_cost(job) - pages_done, 1)
+    admit_job(client, cost)
+    job_writer.update(job_id, {"status": ScrapeJobStatus.PENDING, "error": None})
+    await job_writer.flush_if_write_through()
+
+    JOBS_QUEUED.inc()
+    background_tasks.add_task(wait_for_job, enqueue_job(job, client, cost=cost, resume_state=checkpoint))
+
+    return {
+        "job_id": job_id,
+        "status": "pending",
+        "pages_restored": pages_done,
+        "message": "Scraping job resumed"
+    }
+
+@router.post("/jobs/{job_id}/reextract")
+async def reextract_job(job_id: str, background_tasks: BackgroundTasks, request: Optional[ReextractRequest] = None,
+                        client: str = Depends(get_client)):
+    """Re-run extraction over a job's archived pages as a new job, without re-fetching"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    job = await find_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job_id in active_jobs:
+        raise HTTPException(status_code=409, detail="Job is still running")
+    if not os.path.exists(archive_path(job_id)):
+        raise HTTPException(status_code=404, detail="Job has no archive; scrape with archive enabled")
+
+    request = request or ReextractRequest()
+    # Replays fetch nothing, but extraction still costs a page's worth of work
+    admit_job(client, job_cost(job))
+    overridden = request.selectors or request.extraction_schema or request.schema_name
+    replay = await create_job(
+        ScrapeRequest(
+            url=job["url"],
+            selectors=request.selectors if overridden else job.get("selectors"),
+            crawl_site=job.get("crawl_site", False),
+            max_pages=job.get("max_pages"),
+            extraction_schema=request.extraction_schema if overridden else job.get("extraction_schema"),
+            schema_name=request.schema_name
+        ),
+        extra_fields={"source_job_id": job_id, "replay_archive": archive_path(job_id), "client_id": client}
+    )
+    background_tasks.add_task(wait_for_job, enqueue_job(replay, client))
+
+    return {
+        "job_id": replay["job_id"],
+        "source_job_id": job_id,
+        "status": "pending",
+        "message": "Re-extraction job created successfully"
     }
 
 @router.delete("/jobs/{job_id}")
@@ -222,12 +564,154 @@ async def delete_job(job_id: str):
     if db is None:
         raise HTTPException(status_code=503, detail="Database unavailable")
         
+    if job_queue.cancel(job_id):
+        JOBS_QUEUED.dec()
+    was_buffered = job_writer.discard(job_id)
+    # A find_job awaiting the database now would otherwise re-cache the document
+    result_cache.forget(job_id)
     result = await db.jobs.delete_one({"job_id": job_id})
-    if result.deleted_count == 0:
+    if result.deleted_count == 0 and not was_buffered:
         raise HTTPException(status_code=404, detail="Job not found")
+    await db.profiles.delete_one({"job_id": job_id})
+    await db.checkpoint_pages.delete_many({"job_id": job_id})
+    await remove_job(db, job_id)
+    if os.path.exists(archive_path(job_id)):
+        os.remove(archive_path(job_id))
         
     return {"message": "Job deleted successfully"}
 
+@router.post("/schemas")
+async def save_schema(schema: ExtractionSchema):
+    """Create or replace a named extraction schema"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    doc = schema.model_dump()
+    validate_schema(doc)
+    doc["updated_at"] = datetime.now().isoformat()
+    await db.schemas.replace_one({"name": schema.name}, doc, upsert=True)
+    return {"name": schema.name, "message": "Extraction schema saved"}
+
+@router.get("/schemas", response_model=List[dict])
+async def list_schemas():
+    """List saved extraction schemas"""
+    db = get_database()
+    if db is None:
+        return []
+    cursor = db.schemas.find({}, {"_id": 0}).sort("name", 1)
+    return await cursor.to_list(length=1000)
+
+@router.get("/schemas/{name}")
+async def get_schema(name: str):
+    """Get a saved extraction schema"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    schema = await db.schemas.find_one({"name": name}, {"_id": 0})
+    if not schema:
+        raise HTTPException(status_code=404, detail="Extraction schema not found")
+    return schema
+
+@router.delete("/schemas/{name}")
+async def delete_schema(name: str):
+    """Delete a saved extraction schema"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    result = await db.schemas.delete_one({"name": name})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Extraction schema not found")
+    return {"message": "Extraction schema deleted"}
+
+@router.post("/schedules")
+async def create_schedule(schedule: ScheduleRequest, client: str = Depends(get_client)):
+    """Store a recurring scrape; runs are spread across the interval with jitter"""
+    from app.scheduler import new_schedule
+
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    if schedule.request.extraction_schema:
+        validate_schema(schedule.request.extraction_schema)
+
+    doc = new_schedule(
+        schedule.request.model_dump(mode="json"),
+        schedule.interval_seconds,
+        schedule.jitter_seconds,
+        schedule.name,
+        schedule.enabled
+    )
+    doc["client_id"] = client
+    await db.schedules.insert_one(dict(doc))
+    return doc
+
+@router.get("/schedules", response_model=List[dict])
+async def list_schedules():
+    """List recurring scrape schedules"""
+    db = get_database()
+    if db is None:
+        return []
+    cursor = db.schedules.find({}, {"_id": 0}).sort("created_at", -1)
+    return await cursor.to_list(length=1000)
+
+@router.get("/schedules/{schedule_id}")
+async def get_schedule(schedule_id: str):
+    """Get a schedule and the state of its latest run"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    schedule = await db.schedules.find_one({"schedule_id": schedule_id}, {"_id": 0})
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return schedule
+
+@router.delete("/schedules/{schedule_id}")
+async def delete_schedule(schedule_id: str):
+    """Delete a schedule; a run already in progress finishes normally"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    result = await db.schedules.delete_one({"schedule_id": schedule_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {"message": "Schedule deleted"}
+
+@router.get("/quota")
+async def get_quota(client: str = Depends(get_client)):
+    """The caller's fair-share weight, limits and current usage"""
+    return job_queue.usage(client)
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, description='Search terms; "quoted phrases" and -exclusions supported'),
+    domain: Optional[str] = Query(None, description="Only pages from this domain"),
+    since: Optional[str] = Query(None, description="Completed at or after this ISO date"),
+    until: Optional[str] = Query(None, description="Completed at or before this ISO date"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100)
+):
+    """Full-text search across scraped pages, best matches first"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return await search_pages(db, q, domain, since, until, page, page_size)
+
+@router.post("/search/reindex")
+async def reindex_search():
+    """Rebuild the search index from every completed job"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    jobs = pages = 0
+    cursor = db.jobs.find({"status": ScrapeJobStatus.COMPLETED}, {"job_id": 1, "result": 1, "completed_at": 1})
+    async for job in cursor:
+        data = await unpack_result_data_async((job.get("result") or {}).get("data"))
+        pages += await index_job(db, job["job_id"], data, job.get("completed_at") or "")
+        jobs += 1
+    return {"jobs": jobs, "pages": pages}
+
 @router.get("/analytics", response_model=AnalyticsResponse)
 async def get_analytics():
     """Get analytics"""
@@ -291,15 +775,14 @@ async def export_json(job_id: str):
     if db is None:
         raise HTTPException(status_code=503, detail="Database unavailable")
         
-    job = await db.jobs.find_one({"job_id": job_id})
+    job = await find_job(db, job_id)
     if not job or "result" not in job:
         raise HTTPException(status_code=404, detail="Result not found")
     
     result = job["result"]
-    json_str = json.dumps(result, indent=2, ensure_ascii=False)
     
-    return StreamingResponse(
-        io.BytesIO(json_str.encode('utf-8')),
+    return Response(
+        content=dumps(result, indent=True),
         media_type="application/json",
         headers={"Content-Disposition": f"attachment; filename=scrape_{job_id}.json"}
     )
@@ -311,7 +794,7 @@ async def export_csv(job_id: str):
     if db is None:
         raise HTTPException(status_code=503, detail="Database unavailable")
 
-    job = await db.jobs.find_one({"job_id": job_id})
+    job = await find_job(db, job_id)
     if not job or "result" not in job:
         raise HTTPException(status_code=404, detail="Result not found")
         
@@ -345,13 +828,44 @@ async def export_csv(job_id: str):
             for img in data["images"][:100]:
                 writer.writerow([img.get("alt", ""), img.get("src", "")])
 
-    csv_str = output.getvalue()
-    return StreamingResponse(
-        io.BytesIO(csv_str.encode('utf-8')),
+    return Response(
+        content=output.getvalue().encode('utf-8'),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=scrape_{job_id}.csv"}
     )
 
+@router.get("/export/{job_id}/profile")
+async def export_profile(job_id: str, format: str = Query("collapsed", pattern="^(collapsed|json)$")):
+    """Export a job's CPU profile as collapsed stacks (flamegraph/speedscope) or the full JSON report"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    profile = await db.profiles.find_one({"job_id": job_id}, {"_id": 0})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "json":
+        body = dumps(profile, indent=True)
+        media_type, extension = "application/json", "json"
+    else:
+        body = (profile.get("collapsed", "") + "\n").encode('utf-8')
+        media_type, extension = "text/plain", "txt"
+
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=profile_{job_id}.{extension}"}
+    )
+
+@router.get("/export/{job_id}/warc")
+async def export_archive(job_id: str):
+    """Download a job's raw response archive (gzipped WARC)"""
+    path = archive_path(job_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Archive not found")
+    return FileResponse(path, media_type="application/warc", filename=f"{job_id}.warc.gz")
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,219 @@
+"""
+Recurring scrape schedules
+
+A schedule stores a ScrapeRequest and an interval. Its runs are anchored at a
+per-schedule phase within the interval (derived from its id) rather than at
+the top of the hour, and each run gets random jitter on top, so schedules
+created together still fire spread out. A run is skipped while the previous
+one is still in progress, and deferred while its host or the whole scheduler
+is at its concurrency budget. Due runs are claimed with a conditional update
+so several app instances can share one schedules collection.
+"""
+import asyncio
+import os
+import random
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from app.database import get_database
+from app.fairshare import ANONYMOUS
+from app.metrics import REGISTRY, Counter
+
+SCHEDULE_RUNS = REGISTRY.register(Counter("scheduler_runs_total", "Scheduled runs by outcome"))
+
+
+def _host(url: str) -> str:
+    return urlparse(url if "://" in url else f"https://{url}").netloc.lower()
+
+
+def first_anchor(schedule_id: str, interval: int, now: datetime) -> datetime:
+    """First run slot: a stable offset into the next interval, spreading schedules evenly"""
+    phase = zlib.crc32(schedule_id.encode()) % interval
+    return now + timedelta(seconds=phase)
+
+
+def next_anchor(anchor: datetime, interval: int, now: datetime) -> datetime:
+    """The first slot after now on this schedule's grid; runs missed while down are not replayed"""
+    missed = int((now - anchor).total_seconds() // interval) + 1 if anchor <= now else 0
+    return anchor + timedelta(seconds=interval * max(missed, 1))
+
+
+def new_schedule(request: Dict[str, Any], interval: int, jitter: Optional[int], name: Optional[str], enabled: bool) -> Dict[str, Any]:
+    schedule_id = str(uuid.uuid4())
+    now = datetime.now()
+    jitter = min(interval // 10, 300) if jitter is None else jitter
+    anchor = first_anchor(schedule_id, interval, now)
+    return {
+        "schedule_id": schedule_id,
+        "name": name,
+        "request": request,
+        "interval_seconds": interval,
+        "jitter_seconds": jitter,
+        "enabled": enabled,
+        "anchor_at": anchor.isoformat(),
+        "next_run_at": (anchor + timedelta(seconds=random.uniform(0, jitter))).isoformat(),
+        "last_run_at": None,
+        "last_job_id": None,
+        "running_job_id": None,
+        "running_since": None,
+        "runs": 0,
+        "skipped_runs": 0,
+        "created_at": now.isoformat(),
+    }
+
+
+class Scheduler:
+    def __init__(self):
+        self.tick = float(os.getenv("SCHEDULER_TICK_SECONDS", "5"))
+        self.max_concurrent = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "4"))
+        self.per_host = int(os.getenv("SCHEDULER_HOST_CONCURRENCY", "1"))
+        # A run still marked in progress after this long is assumed lost with its process
+        self.max_run_seconds = float(os.getenv("SCHEDULER_MAX_RUN_SECONDS", str(6 * 3600)))
+        self._running: Dict[str, int] = {}  # host -> runs started by this process
+        self._tasks = set()
+        self._task = None
+
+    def _advance(self, schedule: Dict[str, Any], now: datetime) -> Dict[str, str]:
+        anchor = next_anchor(datetime.fromisoformat(schedule["anchor_at"]), schedule["interval_seconds"], now)
+        jitter = random.uniform(0, schedule.get("jitter_seconds") or 0)
+        return {"anchor_at": anchor.isoformat(), "next_run_at": (anchor + timedelta(seconds=jitter)).isoformat()}
+
+    def _in_progress(self, schedule: Dict[str, Any], now: datetime) -> bool:
+        since = schedule.get("running_since")
+        if not schedule.get("running_job_id") or not since:
+            return False
+        return (now - datetime.fromisoformat(since)).total_seconds() < self.max_run_seconds
+
+    async def _claim(self, db, schedule: Dict[str, Any], fields: Dict[str, Any], inc: Dict[str, int]) -> bool:
+        """Move a due schedule on; False if another instance got to it first"""
+        update = {"$set": fields}
+        if inc:
+            # An empty $inc is rejected by MongoDB before 5.0
+            update["$inc"] = inc
+        claimed = await db.schedules.find_one_and_update(
+            {"schedule_id": schedule["schedule_id"], "next_run_at": schedule["next_run_at"]},
+            update
+        )
+        return claimed is not None
+
+    async def run_due(self):
+        """Start every due schedule that fits within the concurrency budgets"""
+        db = get_database()
+        if db is None:
+            return
+        now = datetime.now()
+        cursor = db.schedules.find(
+            {"enabled": True, "next_run_at": {"$lte": now.isoformat()}}
+        ).sort("next_run_at", 1).limit(100)
+
+        for schedule in await cursor.to_list(length=100):
+            try:
+                await self._run_one(db, schedule, now)
+            except Exception as e:
+                # One bad schedule must not hold up the rest of the tick
+                print(f"Schedule {schedule.get('schedule_id')} failed: {e}")
+                SCHEDULE_RUNS.inc(result="error")
+
+    async def _run_one(self, db, schedule: Dict[str, Any], now: datetime):
+        if self._in_progress(schedule, now):
+            if await self._claim(db, schedule, self._advance(schedule, now), {"skipped_runs": 1}):
+                SCHEDULE_RUNS.inc(result="skipped_overlap")
+            return
+
+        host = _host(schedule["request"]["url"])
+        if sum(self._running.values()) >= self.max_concurrent or self._running.get(host, 0) >= self.per_host:
+            # Left due; picked up again on a later tick once a slot frees up
+            SCHEDULE_RUNS.inc(result="deferred")
+            return
+
+        await self._start(db, schedule, host, now)
+
+    async def _start(self, db, schedule: Dict[str, Any], host: str, now: datetime):
+        from app.fairshare import job_queue
+        from app.models import ScrapeRequest
+        from app.routes import create_job, job_cost
+
+        client = schedule.get("client_id") or ANONYMOUS
+        refused = job_queue.admit(client, job_cost(schedule["request"]))
+        if refused:
+            # Over its owner's quota: this run is skipped like any other that can't start
+            print(f"Schedule {schedule['schedule_id']} run refused: {refused}")
+            if await self._claim(db, schedule, self._advance(schedule, now), {"skipped_runs": 1}):
+                SCHEDULE_RUNS.inc(result="refused")
+            return
+
+        try:
+            job = await create_job(
+                ScrapeRequest(**schedule["request"]),
+                extra_fields={"schedule_id": schedule["schedule_id"], "client_id": schedule.get("client_id")}
+            )
+        except Exception as e:
+            print(f"Schedule {schedule['schedule_id']} could not create a job: {e}")
+            await self._claim(db, schedule, self._advance(schedule, now), {})
+            SCHEDULE_RUNS.inc(result="error")
+            return
+
+        fields = dict(
+            self._advance(schedule, now),
+            last_run_at=now.isoformat(),
+            last_job_id=job["job_id"],
+            running_job_id=job["job_id"],
+            running_since=now.isoformat()
+        )
+        if not await self._claim(db, schedule, fields, {"runs": 1}):
+            # Another instance started this run; drop the job we just queued
+            from app.database import job_writer
+            from app.metrics import JOBS_QUEUED
+            if not job_writer.discard(job["job_id"]):
+                await db.jobs.delete_one({"job_id": job["job_id"]})
+            JOBS_QUEUED.dec()
+            return
+
+        SCHEDULE_RUNS.inc(result="started")
+        self._running[host] = self._running.get(host, 0) + 1
+        task = asyncio.get_running_loop().create_task(
+            self._run_job(db, schedule["schedule_id"], job, host, client)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, db, schedule_id: str, job: Dict[str, Any], host: str, client: str):
+        from app.routes import enqueue_job
+
+        try:
+            # Scheduled runs share their owner's fair-share queue with its API calls
+            await enqueue_job(job, client)
+        finally:
+            self._running[host] -= 1
+            if not self._running[host]:
+                del self._running[host]
+            await db.schedules.update_one(
+                {"schedule_id": schedule_id, "running_job_id": job["job_id"]},
+                {"$set": {"running_job_id": None, "running_since": None}}
+            )
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_due()
+            except Exception as e:
+                print(f"Scheduler tick failed: {e}")
+            await asyncio.sleep(self.tick)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+scheduler = Scheduler()
+
+# Serverless instances freeze between requests, so nothing would tick there
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false" if os.getenv("VERCEL") else "true").lower() == "true"
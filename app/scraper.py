@@ -1,20 +1,62 @@
 import requests
 from bs4 import BeautifulSoup
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Callable, Tuple
 import time
 import os
+import importlib.util
 import re
 from urllib.parse import urljoin, urlparse, urlunparse
 import json
 from collections import defaultdict
 
-# Optional Playwright import for Vercel compatibility
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    sync_playwright = None
+from app.metrics import StageTimer, ERRORS_TOTAL, BYTES_FETCHED
+from app.extraction import ExtractionPlan, compile_schema
+from app.linkcheck import LinkChecker
+from app.archive import WarcWriter
+from app import dnscache
+
+# Optional Playwright support for Vercel compatibility; the package is only
+# located here and imported when a Playwright scrape actually runs
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+
+
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml", "application/xml", "text/xml", "text/plain"}
+
+RENDER_MODES = ("static", "playwright", "auto")
+
+# Element ids and attributes that frameworks mount client-rendered apps on
+APP_ROOT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte", "main-app"}
+APP_ROOT_ATTRS = ("data-reactroot", "ng-app", "ng-version", "data-v-app", "data-server-rendered")
+# Only these render reasons send the rest of a host to Playwright; short pages
+# with a script tag (contact pages, 404s) are common on static sites too
+HOST_RENDER_REASONS = ("empty app root", "noscript asks for JavaScript")
+NOSCRIPT_HINT = re.compile(r"enable javascript|javascript (is )?(required|disabled)|requires javascript|turn on javascript", re.I)
+NON_VISIBLE_TAGS = {"script", "style", "noscript", "template"}
+
+# Magic numbers of formats that are never worth parsing as HTML
+BINARY_SIGNATURES = (
+    b"%PDF", b"PK\x03\x04", b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"RIFF",
+    b"\x1f\x8b", b"BZh", b"7z\xbc\xaf", b"OggS", b"ID3",
+)
+
+
+def crawl_page_summary(page_data: Dict[str, Any], structured: bool = False) -> Dict[str, Any]:
+    """The subset of a page's data kept in crawl results"""
+    if structured:
+        return {
+            "url": page_data.get("url"),
+            "title": page_data.get("title"),
+            "structured": page_data.get("structured", {}),
+            "timings": page_data.get("timings", {}),
+        }
+    return {
+        "url": page_data.get("url"),
+        "title": page_data.get("title"),
+        "metadata": page_data.get("metadata", {}),
+        "contact_info": page_data.get("contact_info", {}),
+        "social_links": page_data.get("social_links", {}),
+        "timings": page_data.get("timings", {}),
+    }
 
 
 class WebScraper:
@@ -25,6 +67,15 @@ class WebScraper:
         )
         self.timeout = int(os.getenv("REQUEST_TIMEOUT", "30"))
         self.max_retries = int(os.getenv("MAX_RETRIES", "3"))
+        self.checkpoint_interval = int(os.getenv("CRAWL_CHECKPOINT_INTERVAL", "5"))
+        self.max_response_bytes = int(os.getenv("MAX_RESPONSE_BYTES", str(10 * 1024 * 1024)))
+        self.chunk_size = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(64 * 1024)))
+        self.link_checker = LinkChecker(headers={"User-Agent": self.user_agent})
+        # Auto render mode: pages with less visible text than this are candidates for rendering
+        self.auto_render_min_text = int(os.getenv("AUTO_RENDER_MIN_TEXT", "200"))
+        self.auto_render_memory_ttl = float(os.getenv("AUTO_RENDER_MEMORY_TTL", "3600"))
+        self._render_hosts: Dict[str, float] = {}  # host -> until when it is rendered directly
+        dnscache.install()
 
     def _get_headers(self) -> Dict[str, str]:
         """Return polite scraping headers"""
@@ -36,6 +87,109 @@ class WebScraper:
             "Connection": "keep-alive",
         }
 
+    def _is_html_type(self, content_type: str) -> bool:
+        """Check whether a Content-Type header denotes a parseable markup page"""
+        mime = content_type.split(";")[0].strip().lower()
+        return mime in HTML_CONTENT_TYPES or mime.endswith("+xml")
+
+    def _looks_binary(self, chunk: bytes) -> bool:
+        """Sniff the first bytes of a body for known binary formats"""
+        head = chunk[:16]
+        return head.startswith(BINARY_SIGNATURES) or b"\x00" in chunk[:512]
+
+    def _needs_rendering(self, soup: BeautifulSoup) -> Optional[str]:
+        """
+        Guess whether a statically fetched page only fills in with JavaScript
+
+        Returns:
+            The reason rendering looks necessary, or None
+        """
+        body = soup.body
+        if body is None:
+            return "no body"
+
+        text_length = sum(
+            len(s.strip()) for s in body.find_all(string=True)
+            if s.parent.name not in NON_VISIBLE_TAGS
+        )
+        if text_length >= self.auto_render_min_text:
+            return None
+
+        for elem in body.find_all(True):
+            if elem.get("id") in APP_ROOT_IDS or elem.name == "app-root" or any(elem.has_attr(a) for a in APP_ROOT_ATTRS):
+                if not elem.get_text(strip=True):
+                    return f"empty app root <{elem.name} id={elem.get('id')!r}>"
+        for noscript in soup.find_all("noscript"):
+            if NOSCRIPT_HINT.search(noscript.get_text(" ")):
+                return "noscript asks for JavaScript"
+        if body.find("script", src=True) is not None:
+            return f"little visible text ({text_length} chars) and external scripts"
+        return None
+
+    def _remember_render(self, host: str):
+        self._render_hosts[host] = time.monotonic() + self.auto_render_memory_ttl
+
+    def _renders_host(self, host: str) -> bool:
+        until = self._render_hosts.get(host)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._render_hosts.pop(host, None)
+            return False
+        return True
+
+    def _fetch(
+        self,
+        url: str,
+        html_only: bool = False,
+        timer: Optional[StageTimer] = None
+    ) -> Tuple[requests.Response, bytes, bool]:
+        """
+        Stream a response body, stopping once max_response_bytes is reached
+
+        The body is decompressed chunk by chunk as it arrives, so the cap applies
+        to the decoded size. With html_only, non-HTML responses are rejected from
+        their headers (or first chunk) before the body is downloaded.
+
+        Returns:
+            Tuple of (response, body bytes, truncated flag)
+        """
+        timer = timer or StageTimer()
+        dnscache.take_lookup_time()
+        with timer.stage("request"):
+            response = requests.get(
+                url,
+                headers=self._get_headers(),
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True
+            )
+        # Resolution happens inside "request"; reported separately as well
+        dns_seconds = dnscache.take_lookup_time()
+        if dns_seconds:
+            timer.record("dns", dns_seconds)
+        with response:
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "")
+            if html_only and content_type and not self._is_html_type(content_type):
+                raise Exception(f"Skipped non-HTML content: {content_type}")
+
+            body = bytearray()
+            truncated = False
+            with timer.stage("download"):
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if not body and html_only and self._looks_binary(chunk):
+                        raise Exception("Skipped binary content")
+                    body.extend(chunk)
+                    if len(body) >= self.max_response_bytes:
+                        del body[self.max_response_bytes:]
+                        truncated = True
+                        break
+
+        BYTES_FETCHED.inc(len(body))
+        return response, bytes(body), truncated
+
     def _extract_metadata(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
         """Extract all metadata from page"""
         metadata = {
@@ -176,14 +330,33 @@ class WebScraper:
         self,
         base_url: str,
         max_pages: int = 10,
-        use_playwright: bool = False,
-        wait_time: int = 3
+        render_mode: str = "static",
+        wait_time: int = 3,
+        resume_state: Optional[Dict[str, Any]] = None,
+        checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+        plan: Optional[ExtractionPlan] = None,
+        link_targets: Optional[Set[str]] = None,
+        archive: Optional[WarcWriter] = None
     ) -> Dict[str, Any]:
-        """Crawl multiple pages of a site"""
-        visited = set()
-        to_visit = [base_url]
-        pages_data = []
+        """
+        Crawl multiple pages of a site
+
+        If resume_state is given (a previous checkpoint), the crawl continues from
+        that frontier instead of starting over. checkpoint is called with the
+        current frontier state every `checkpoint_interval` pages; each state carries
+        only the pages crawled since the previous one ("new_pages"), and
+        "pages_saved" counts all pages up to it. If link_targets
+        is given, every page's link and image URLs are added to it. Fetched pages
+        are written to archive when one is given.
+        """
+        state = resume_state or {}
+        visited = set(state.get("visited", []))
+        to_visit = list(state.get("to_visit", [base_url]))
+        pages_data = list(state.get("pages", []))
+        if link_targets is not None:
+            link_targets.update(state.get("link_targets", []))
         domain = urlparse(base_url).netloc
+        pages_checkpointed = len(pages_data)
 
         while to_visit and len(visited) < max_pages:
             current_url = to_visit.pop(0)
@@ -191,19 +364,15 @@ class WebScraper:
                 continue
 
             try:
-                if use_playwright:
-                    page_data = self.scrape_with_playwright(current_url, wait_time=wait_time)
-                else:
-                    page_data = self.scrape_static(current_url)
+                page_data = self._scrape_page(
+                    current_url, render_mode, wait_time=wait_time, plan=plan,
+                    collect_links=True, html_only=True, archive=archive
+                )
 
                 visited.add(current_url)
-                pages_data.append({
-                    "url": current_url,
-                    "title": page_data.get("title"),
-                    "metadata": page_data.get("metadata", {}),
-                    "contact_info": page_data.get("contact_info", {}),
-                    "social_links": page_data.get("social_links", {}),
-                })
+                if link_targets is not None:
+                    link_targets.update(self._link_targets(page_data))
+                pages_data.append(crawl_page_summary(dict(page_data, url=current_url), plan is not None))
 
                 # Find links on this page
                 if "links" in page_data:
@@ -216,6 +385,10 @@ class WebScraper:
                             if parsed.netloc == domain and full_url not in visited and len(to_visit) < max_pages * 2:
                                 to_visit.append(full_url)
 
+                if checkpoint and len(pages_data) - pages_checkpointed >= self.checkpoint_interval:
+                    checkpoint(self._frontier_state(visited, to_visit, pages_data, pages_checkpointed, link_targets))
+                    pages_checkpointed = len(pages_data)
+
             except Exception as e:
                 continue
 
@@ -226,41 +399,71 @@ class WebScraper:
             "crawl_type": "site_wide",
         }
 
-    def scrape_static(self, url: str, selectors: Optional[List[str]] = None) -> Dict[str, Any]:
-        """
-        Scrape static HTML content using requests and BeautifulSoup
-        
-        Args:
-            url: Target URL to scrape
-            selectors: Optional list of CSS selectors to extract specific elements
-            
-        Returns:
-            Dictionary containing scraped data
-        """
-        try:
-            response = requests.get(
-                url,
-                headers=self._get_headers(),
-                timeout=self.timeout,
-                allow_redirects=True
-            )
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'lxml')
+    def _frontier_state(
+        self,
+        visited: Set[str],
+        to_visit: List[str],
+        pages_data: List[Dict[str, Any]],
+        pages_checkpointed: int,
+        link_targets: Optional[Set[str]] = None
+    ) -> Dict[str, Any]:
+        """Crawl progress since the last checkpoint; with the earlier pages, _crawl_site can resume from it"""
+        state = {
+            "visited": list(visited),
+            "to_visit": list(to_visit),
+            "pages_saved": len(pages_data),
+            "new_pages": pages_data[pages_checkpointed:],
+        }
+        if link_targets is not None:
+            state["link_targets"] = list(link_targets)
+        return state
+
+    def _link_targets(self, page_data: Dict[str, Any]) -> List[str]:
+        """URLs of a scraped page's links and images"""
+        urls = [link.get("href") for link in page_data.get("links", [])]
+        urls.extend(img.get("src") for img in page_data.get("images", []))
+        return [u for u in urls if u]
+
+    def _extract_link_targets(self, soup: BeautifulSoup, url: str, timer: StageTimer) -> Dict[str, Any]:
+        """Bare link and image URLs, for pages whose extraction doesn't include them"""
+        with timer.stage("extract.links"):
+            links = [{"href": urljoin(url, link.get("href"))} for link in soup.find_all("a", href=True)]
+        with timer.stage("extract.images"):
+            images = [{"src": img["src"]} for img in self._extract_images_detailed(soup, url)]
+        return {"links": links, "images": images}
+
+    def _extract_page(
+        self,
+        soup: BeautifulSoup,
+        url: str,
+        selectors: Optional[List[str]],
+        timer: StageTimer,
+        plan: Optional[ExtractionPlan] = None,
+        collect_links: bool = False
+    ) -> Dict[str, Any]:
+        """Run all extractors over a parsed page, timing each one"""
+        if plan is not None:
+            # Schema jobs only extract and serialize what the schema asks for
+            with timer.stage("extract.schema"):
+                result = {"structured": plan.extract(soup, url)}
+            if collect_links:
+                result.update(self._extract_link_targets(soup, url, timer))
+            return result
+
+        with timer.stage("extract.text"):
             text_content = soup.get_text(separator="\n", strip=True)
-            
-            result = {
-                "url": url,
-                "title": soup.title.string if soup.title else None,
-                "status_code": response.status_code,
-                "content_type": response.headers.get("Content-Type", ""),
-                "metadata": self._extract_metadata(soup, url),
-                "contact_info": self._extract_contact_info(text_content),
-                "social_links": self._extract_social_links(soup, url),
-            }
-            
-            if selectors:
-                # Extract specific elements using selectors
+
+        result = {}
+        with timer.stage("extract.metadata"):
+            result["metadata"] = self._extract_metadata(soup, url)
+        with timer.stage("extract.contact_info"):
+            result["contact_info"] = self._extract_contact_info(text_content)
+        with timer.stage("extract.social_links"):
+            result["social_links"] = self._extract_social_links(soup, url)
+        
+        if selectors:
+            # Extract specific elements using selectors
+            with timer.stage("extract.selectors"):
                 extracted_data = {}
                 for selector in selectors:
                     elements = soup.select(selector)
@@ -273,9 +476,12 @@ class WebScraper:
                         for elem in elements
                     ]
                 result["extracted"] = extracted_data
-            else:
-                # Extract all content
-                result["text_content"] = text_content[:50000]  # Limit text content
+            if collect_links:
+                result.update(self._extract_link_targets(soup, url, timer))
+        else:
+            # Extract all content
+            result["text_content"] = text_content[:50000]  # Limit text content
+            with timer.stage("extract.links"):
                 result["links"] = [
                     {
                         "text": link.get_text(strip=True),
@@ -284,31 +490,130 @@ class WebScraper:
                     }
                     for link in soup.find_all("a", href=True)
                 ]
+            with timer.stage("extract.images"):
                 result["images"] = self._extract_images_detailed(soup, url)
-                
-                # Extract headings
+            
+            with timer.stage("extract.headings"):
                 result["headings"] = {
                     "h1": [h.get_text(strip=True) for h in soup.find_all("h1")],
                     "h2": [h.get_text(strip=True) for h in soup.find_all("h2")],
                     "h3": [h.get_text(strip=True) for h in soup.find_all("h3")],
                 }
-                
-                # Extract paragraphs
+            
+            with timer.stage("extract.paragraphs"):
                 paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")]
                 result["paragraphs"] = [p for p in paragraphs if len(p) > 20][:50]  # Limit to 50
+        
+        return result
+
+    def scrape_static(
+        self,
+        url: str,
+        selectors: Optional[List[str]] = None,
+        html_only: bool = False,
+        plan: Optional[ExtractionPlan] = None,
+        collect_links: bool = False,
+        detect_rendering: bool = False,
+        archive: Optional[WarcWriter] = None
+    ) -> Dict[str, Any]:
+        """
+        Scrape static HTML content using requests and BeautifulSoup
+        
+        Args:
+            url: Target URL to scrape
+            selectors: Optional list of CSS selectors to extract specific elements
+            html_only: Skip responses that are not HTML without downloading them
+            plan: Compiled extraction schema; replaces the default extractors
+            collect_links: With a plan or selectors, still return the page's links and images (for crawling and link checks)
+            detect_rendering: Check whether the page needs JavaScript; if it does and
+                Playwright is available, return early with only "render_required" set
+            archive: Archive to record the raw response in
+            
+        Returns:
+            Dictionary containing scraped data
+        """
+        timer = StageTimer()
+        try:
+            response, body, truncated = self._fetch(url, html_only=html_only, timer=timer)
+            if archive is not None:
+                with timer.stage("archive"):
+                    archive.write_response(url, response.status_code, response.reason, response.headers, body, truncated)
+            
+            with timer.stage("parse"):
+                soup = BeautifulSoup(body, 'lxml')
+            
+            result = {
+                "url": url,
+                "title": soup.title.string if soup.title else None,
+                "status_code": response.status_code,
+                "content_type": response.headers.get("Content-Type", ""),
+                "bytes_downloaded": len(body),
+                "truncated": truncated,
+            }
+            if detect_rendering:
+                with timer.stage("render_check"):
+                    reason = self._needs_rendering(soup)
+                if reason and PLAYWRIGHT_AVAILABLE:
+                    # Skip extraction, the rendered page replaces this one; the parsed
+                    # page is kept in case rendering fails
+                    result["render_required"] = reason
+                    result["_soup"] = soup
+                    result["timings"] = timer.finish("static")
+                    return result
+                if reason:
+                    # Playwright unavailable: keep the static result but flag it
+                    result["render_hint"] = reason
+            result.update(self._extract_page(soup, url, selectors, timer, plan, collect_links))
+            result["timings"] = timer.finish("static")
             
             return result
             
         except requests.exceptions.RequestException as e:
+            ERRORS_TOTAL.inc(type=type(e).__name__)
             raise Exception(f"Request failed: {str(e)}")
         except Exception as e:
+            ERRORS_TOTAL.inc(type=type(e).__name__)
             raise Exception(f"Scraping failed: {str(e)}")
 
+    def extract_archived(
+        self,
+        record: Dict[str, Any],
+        selectors: Optional[List[str]] = None,
+        extraction_schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run extraction over an archived page (a record from app.archive.read_records)
+
+        Produces the same result shape as scrape_static without any network access.
+        """
+        plan = compile_schema(extraction_schema) if extraction_schema else None
+        url = record["url"]
+        timer = StageTimer()
+        with timer.stage("parse"):
+            soup = BeautifulSoup(record["body"], 'lxml')
+
+        result = {
+            "url": url,
+            # Plain str: a NavigableString would drag the whole tree through pickling
+            "title": str(soup.title.string) if soup.title and soup.title.string else None,
+            "status_code": record.get("status"),
+            "content_type": record.get("headers", {}).get("Content-Type", ""),
+            "bytes_downloaded": len(record["body"]),
+            "truncated": record.get("truncated", False),
+            "from_archive": True,
+        }
+        result.update(self._extract_page(soup, url, selectors, timer, plan, collect_links=True))
+        result["timings"] = timer.finish("archive")
+        return result
+
     def scrape_with_playwright(
         self,
         url: str,
         selectors: Optional[List[str]] = None,
-        wait_time: int = 5
+        wait_time: int = 5,
+        plan: Optional[ExtractionPlan] = None,
+        collect_links: bool = False,
+        archive: Optional[WarcWriter] = None
     ) -> Dict[str, Any]:
         """
         Scrape JavaScript-rendered content using Playwright
@@ -317,6 +622,9 @@ class WebScraper:
             url: Target URL to scrape
             selectors: Optional list of CSS selectors to extract specific elements
             wait_time: Time to wait for page to load (seconds)
+            plan: Compiled extraction schema; replaces the default extractors
+            collect_links: With a plan or selectors, still return the page's links and images (for crawling and link checks)
+            archive: Archive to record the rendered page in
             
         Returns:
             Dictionary containing scraped data
@@ -324,76 +632,117 @@ class WebScraper:
         if not PLAYWRIGHT_AVAILABLE:
             raise Exception("Playwright is not available. It may not be installed or is not supported in this environment (e.g., Vercel serverless).")
         
+        from playwright.sync_api import sync_playwright
+
+        timer = StageTimer()
         try:
             with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.set_extra_http_headers(self._get_headers())
+                with timer.stage("browser_launch"):
+                    browser = p.chromium.launch(headless=True)
+                    page = browser.new_page()
+                    page.set_extra_http_headers(self._get_headers())
+                
+                with timer.stage("render"):
+                    page.goto(url, wait_until="networkidle", timeout=self.timeout * 1000)
+                    time.sleep(wait_time)  # Additional wait for dynamic content
                 
-                page.goto(url, wait_until="networkidle", timeout=self.timeout * 1000)
-                time.sleep(wait_time)  # Additional wait for dynamic content
+                    # Get page content
+                    title = page.title()
+                    content = page.content()
                 
-                # Get page content
-                title = page.title()
-                content = page.content()
+                if archive is not None:
+                    with timer.stage("archive"):
+                        archive.write_resource(url, content.encode("utf-8"))
                 
-                soup = BeautifulSoup(content, 'lxml')
-                text_content = soup.get_text(separator="\n", strip=True)
+                with timer.stage("parse"):
+                    soup = BeautifulSoup(content, 'lxml')
                 
                 result = {
                     "url": url,
                     "title": title,
                     "status_code": 200,
                     "content_type": "text/html",
-                    "metadata": self._extract_metadata(soup, url),
-                    "contact_info": self._extract_contact_info(text_content),
-                    "social_links": self._extract_social_links(soup, url),
                 }
-                
-                if selectors:
-                    # Extract specific elements using selectors
-                    extracted_data = {}
-                    for selector in selectors:
-                        elements = soup.select(selector)
-                        extracted_data[selector] = [
-                            {
-                                "text": elem.get_text(strip=True),
-                                "html": str(elem),
-                                "attributes": dict(elem.attrs)
-                            }
-                            for elem in elements
-                        ]
-                    result["extracted"] = extracted_data
-                else:
-                    # Extract all content
-                    result["text_content"] = text_content[:50000]  # Limit text content
-                    result["links"] = [
-                        {
-                            "text": link.get_text(strip=True),
-                            "href": urljoin(url, link.get("href")),
-                            "title": link.get("title", "")
-                        }
-                        for link in soup.find_all("a", href=True)
-                    ]
-                    result["images"] = self._extract_images_detailed(soup, url)
-                    
-                    # Extract headings
-                    result["headings"] = {
-                        "h1": [h.get_text(strip=True) for h in soup.find_all("h1")],
-                        "h2": [h.get_text(strip=True) for h in soup.find_all("h2")],
-                        "h3": [h.get_text(strip=True) for h in soup.find_all("h3")],
-                    }
-                    
-                    # Extract paragraphs
-                    paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")]
-                    result["paragraphs"] = [p for p in paragraphs if len(p) > 20][:50]  # Limit to 50
+                result.update(self._extract_page(soup, url, selectors, timer, plan, collect_links))
                 
                 browser.close()
+                result["timings"] = timer.finish("playwright")
                 return result
                 
         except Exception as e:
+            ERRORS_TOTAL.inc(type=type(e).__name__)
             raise Exception(f"Playwright scraping failed: {str(e)}")
 
+    def _scrape_page(
+        self,
+        url: str,
+        render_mode: str,
+        selectors: Optional[List[str]] = None,
+        wait_time: int = 5,
+        plan: Optional[ExtractionPlan] = None,
+        collect_links: bool = False,
+        html_only: bool = False,
+        archive: Optional[WarcWriter] = None
+    ) -> Dict[str, Any]:
+        """Scrape one page statically, with Playwright, or (auto) whichever it needs"""
+        if render_mode == "playwright":
+            return self.scrape_with_playwright(
+                url, selectors, wait_time, plan=plan, collect_links=collect_links, archive=archive
+            )
+        if render_mode == "static":
+            return self.scrape_static(
+                url, selectors, html_only=html_only, plan=plan, collect_links=collect_links, archive=archive
+            )
+
+        host = urlparse(url).netloc
+        if PLAYWRIGHT_AVAILABLE and self._renders_host(host):
+            try:
+                result = self.scrape_with_playwright(
+                    url, selectors, wait_time, plan=plan, collect_links=collect_links, archive=archive
+                )
+            except Exception as e:
+                # Forget the host and let the static path below decide again
+                print(f"Rendering {url} failed, retrying statically: {e}")
+                self._render_hosts.pop(host, None)
+            else:
+                result["render_mode"] = "playwright"
+                result["render_reason"] = "host needed rendering before"
+                return result
+
+        result = self.scrape_static(
+            url, selectors, html_only=html_only, plan=plan,
+            collect_links=collect_links, detect_rendering=True, archive=archive
+        )
+        reason = result.get("render_required")
+        if reason is None:
+            result["render_mode"] = "static"
+            return result
+
+        soup = result.pop("_soup")
+        static_timings = result["timings"]
+        try:
+            rendered = self.scrape_with_playwright(
+                url, selectors, wait_time, plan=plan, collect_links=collect_links, archive=archive
+            )
+        except Exception as e:
+            # A static page beats a failed one: extract it and flag it as when Playwright is missing
+            timer = StageTimer()
+            result.update(self._extract_page(soup, url, selectors, timer, plan, collect_links))
+            static_timings.update({name: round(seconds * 1000, 2) for name, seconds in timer.timings.items()})
+            del result["render_required"]
+            result["render_hint"] = reason
+            result["render_error"] = str(e)
+            result["render_mode"] = "static"
+            return result
+
+        # Sites built on a client-side framework are usually built on it throughout
+        if reason.startswith(HOST_RENDER_REASONS):
+            self._remember_render(host)
+        rendered["render_mode"] = "playwright"
+        rendered["render_reason"] = reason
+        rendered["timings"]["static_attempt"] = static_timings["total"]
+        return rendered
+
     def scrape(
         self,
         url: str,
@@ -401,7 +750,13 @@ class WebScraper:
         use_playwright: bool = False,
         wait_time: int = 5,
         crawl_site: bool = False,
-        max_pages: int = 10
+        max_pages: int = 10,
+        resume_state: Optional[Dict[str, Any]] = None,
+        checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+        extraction_schema: Optional[Dict[str, Any]] = None,
+        check_links: bool = False,
+        render_mode: Optional[str] = None,
+        archive: Optional[WarcWriter] = None
     ) -> Dict[str, Any]:
         """
         Main scraping method that routes to appropriate scraper
@@ -413,6 +768,12 @@ class WebScraper:
             wait_time: Wait time for Playwright
             crawl_site: If True and only domain provided, crawl entire site
             max_pages: Maximum pages to crawl if crawl_site is True
+            resume_state: Crawl checkpoint to continue from
+            checkpoint: Callback receiving periodic crawl checkpoints
+            extraction_schema: Declarative schema (see app/extraction.py) to extract instead of the defaults
+            check_links: Verify the collected link and image URLs and report broken ones
+            render_mode: "static", "playwright" or "auto"; overrides use_playwright
+            archive: WARC writer (see app/archive.py) receiving every fetched page
             
         Returns:
             Dictionary containing scraped data
@@ -422,13 +783,29 @@ class WebScraper:
         if not parsed.scheme:
             url = "https://" + url
             parsed = urlparse(url)
+
+        plan = compile_schema(extraction_schema) if extraction_schema else None
+        render_mode = render_mode or ("playwright" if use_playwright else "static")
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode {render_mode!r}, expected one of {RENDER_MODES}")
         
         # If only domain provided and crawl_site is True, crawl the site
         if crawl_site and parsed.path in ["", "/"]:
-            return self._crawl_site(url, max_pages, use_playwright, wait_time)
-        
+            link_targets = set() if check_links else None
+            result = self._crawl_site(
+                url, max_pages, render_mode, wait_time,
+                resume_state=resume_state, checkpoint=checkpoint, plan=plan,
+                link_targets=link_targets, archive=archive
+            )
         # Single page scraping
-        if use_playwright:
-            return self.scrape_with_playwright(url, selectors, wait_time)
         else:
-            return self.scrape_static(url, selectors)
+            result = self._scrape_page(
+                url, render_mode, selectors, wait_time, plan=plan, collect_links=check_links, archive=archive
+            )
+            link_targets = self._link_targets(result)
+
+        if check_links:
+            # One deduplicated pass over everything found, across all crawled pages
+            result["link_check"] = self.link_checker.check(link_targets)
+        
+        return result
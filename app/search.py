@@ -0,0 +1,155 @@
+"""
+Full-text search over scraped pages
+
+Completed jobs are flattened into one document per page in the search_pages
+collection, which carries a weighted MongoDB text index (title over headings
+over body text). Job results themselves may be stored compressed, so they
+can't be indexed in place. Queries use MongoDB $text syntax: quoted
+"exact phrases" and -excluded terms work as usual.
+"""
+import os
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+SEARCH_TEXT_MAX_CHARS = int(os.getenv("SEARCH_TEXT_MAX_CHARS", "20000"))
+SNIPPET_CHARS = 160
+
+_indexes_ready = False
+
+
+def normalize_domain(value: str) -> str:
+    """Host of a URL or bare domain, lowercased and without www."""
+    host = urlparse(value if "://" in value else f"//{value}").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+async def ensure_indexes(db):
+    """Create the search indexes once per process"""
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    await db.search_pages.create_index(
+        [("title", "text"), ("headings", "text"), ("text", "text")],
+        weights={"title": 10, "headings": 5, "text": 1},
+        name="page_text"
+    )
+    await db.search_pages.create_index([("domain", 1), ("completed_at", -1)])
+    await db.search_pages.create_index("job_id")
+    _indexes_ready = True
+
+
+def _page_text(page: Dict[str, Any]) -> str:
+    if page.get("text_content"):
+        return page["text_content"][:SEARCH_TEXT_MAX_CHARS]
+    parts = list(page.get("paragraphs") or [])
+    # Crawled pages keep only metadata; descriptions are the best text they have
+    meta = page.get("metadata") or {}
+    for source, key in ((meta.get("meta_tags"), "description"), (meta.get("open_graph"), "og:description")):
+        if source and source.get(key):
+            parts.append(source[key])
+    return "\n".join(parts)[:SEARCH_TEXT_MAX_CHARS]
+
+
+def page_documents(job_id: str, data: Dict[str, Any], completed_at: str) -> List[Dict[str, Any]]:
+    """Search documents for every page in a job result"""
+    pages = data.get("pages") if data.get("crawl_type") == "site_wide" else [data]
+    docs = []
+    for page in pages or []:
+        url = page.get("url")
+        if not url:
+            continue
+        headings = page.get("headings") or {}
+        docs.append({
+            "job_id": job_id,
+            "url": url,
+            "domain": normalize_domain(url),
+            "title": page.get("title") or "",
+            "headings": "\n".join(h for level in ("h1", "h2", "h3") for h in headings.get(level, [])),
+            "text": _page_text(page),
+            "completed_at": completed_at,
+        })
+    return docs
+
+
+async def index_job(db, job_id: str, data: Optional[Dict[str, Any]], completed_at: str) -> int:
+    """(Re)index a completed job's pages; returns how many were indexed"""
+    if not SEARCH_INDEX_ENABLED or not data:
+        return 0
+    await ensure_indexes(db)
+    await db.search_pages.delete_many({"job_id": job_id})
+    docs = page_documents(job_id, data, completed_at)
+    if docs:
+        await db.search_pages.insert_many(docs, ordered=False)
+    return len(docs)
+
+
+async def remove_job(db, job_id: str):
+    await db.search_pages.delete_many({"job_id": job_id})
+
+
+def _snippet(text: str, query: str) -> str:
+    """Text around the first phrase or term of the query found in text"""
+    phrases = re.findall(r'"([^"]+)"', query)
+    terms = [t for t in re.sub(r'"[^"]*"', " ", query).split() if not t.startswith("-")]
+    lowered = text.lower()
+    for needle in phrases + terms:
+        pos = lowered.find(needle.lower())
+        if pos >= 0:
+            start = max(0, pos - SNIPPET_CHARS // 2)
+            snippet = text[start:start + SNIPPET_CHARS].replace("\n", " ")
+            return ("…" if start else "") + snippet + ("…" if start + SNIPPET_CHARS < len(text) else "")
+    return text[:SNIPPET_CHARS].replace("\n", " ")
+
+
+async def search_pages(
+    db,
+    query: str,
+    domain: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20
+) -> Dict[str, Any]:
+    """Ranked, paginated search; since/until compare against ISO completion times"""
+    await ensure_indexes(db)
+    filters: Dict[str, Any] = {"$text": {"$search": query}}
+    if domain:
+        filters["domain"] = normalize_domain(domain)
+    if since or until:
+        filters["completed_at"] = {}
+        if since:
+            filters["completed_at"]["$gte"] = since
+        if until:
+            # A bare date means through the end of that day
+            filters["completed_at"]["$lte"] = until + "T23:59:59.999999" if len(until) == 10 else until
+
+    score = {"$meta": "textScore"}
+    cursor = (
+        db.search_pages.find(filters, {"_id": 0, "headings": 0, "score": score})
+        .sort([("score", score)])
+        .skip((page - 1) * page_size)
+        .limit(page_size)
+    )
+    hits = await cursor.to_list(length=page_size)
+    total = await db.search_pages.count_documents(filters)
+
+    return {
+        "query": query,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "results": [
+            {
+                "job_id": hit["job_id"],
+                "url": hit["url"],
+                "title": hit.get("title"),
+                "domain": hit.get("domain"),
+                "completed_at": hit.get("completed_at"),
+                "score": round(hit.get("score", 0), 4),
+                "snippet": _snippet(hit.get("text", ""), query),
+            }
+            for hit in hits
+        ],
+    }
@@ -0,0 +1,72 @@
+"""
+Cold-start benchmark for the serverless entry point
+
+Imports api.index in a fresh interpreter with -X importtime and reports the
+cold-start time per module (median over several runs):
+
+    python -m benchmarks.bench_imports -n 5 --top 30
+
+benchmarks.run also includes the total import time as a regular case.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.fixtures import FixtureServer
+from benchmarks.harness import Case
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET = "api.index"
+
+
+def import_profile(target: str = TARGET) -> Dict[str, Tuple[int, int]]:
+    """Import target in a new interpreter; returns module -> (self us, cumulative us)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, cwd=ROOT
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def cases(server: FixtureServer) -> List[Case]:
+    return [Case(f"cold_start.import_{TARGET.replace('.', '_')}", lambda: import_profile(), iterations=5)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module cold-start import time")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--target", default=TARGET)
+    args = parser.parse_args()
+
+    samples = defaultdict(list)
+    for _ in range(args.runs):
+        for name, (self_us, cumulative_us) in import_profile(args.target).items():
+            samples[name].append((self_us, cumulative_us))
+
+    rows = [
+        (name, statistics.median(s for s, _ in runs), statistics.median(c for _, c in runs))
+        for name, runs in samples.items()
+    ]
+    total = next(c for name, _, c in rows if name == args.target)
+    print(f"{args.target}: {total / 1000:.1f} ms cumulative (median of {args.runs})\n")
+    print(f"{'module':<50} {'self ms':>10} {'cumulative ms':>15}")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{name:<50} {self_us / 1000:>10.1f} {cumulative_us / 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
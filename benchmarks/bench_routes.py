@@ -0,0 +1,98 @@
+"""
+Benchmarks for the job endpoints in app/routes.py against an in-memory Mongo stand-in
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import BackgroundTasks
+
+from app import database, routes
+from app.cache import result_cache
+from app.fairshare import ANONYMOUS
+from app.models import ScrapeRequest, ScrapeJobStatus
+from benchmarks.fixtures import FixtureServer
+from benchmarks.harness import Case
+from benchmarks.mongo_stub import FakeDatabase
+
+
+def seed_jobs(db: FakeDatabase, scraper, server: FixtureServer, count: int = 500) -> List[str]:
+    """Insert completed jobs carrying realistic scrape results"""
+    data = scraper.scrape_static(server.url("/synthetic/100"))
+    start = datetime(2024, 1, 1)
+    job_ids = []
+    for i in range(count):
+        job_id = str(uuid.uuid4())
+        created = start + timedelta(minutes=i)
+        db.jobs.docs.append({
+            "_id": i,
+            "job_id": job_id,
+            "url": data["url"],
+            "status": ScrapeJobStatus.COMPLETED,
+            "created_at": created.isoformat(),
+            "completed_at": (created + timedelta(seconds=2)).isoformat(),
+            "duration_seconds": 2.0,
+            "result": {
+                "job_id": job_id,
+                "url": data["url"],
+                "status": ScrapeJobStatus.COMPLETED,
+                "data": data,
+                "error": None,
+                "created_at": created.isoformat(),
+                "completed_at": (created + timedelta(seconds=2)).isoformat(),
+            },
+        })
+        job_ids.append(job_id)
+    return job_ids
+
+
+def cases(server: FixtureServer) -> List[Case]:
+    db = FakeDatabase()
+    database.db.db = db
+    job_ids = seed_jobs(db, routes.get_scraper(), server)
+    job_id = job_ids[len(job_ids) // 2]
+    request = ScrapeRequest(url=server.url("/synthetic/10"))
+    # No job slots: created jobs stay queued and are cancelled, so only the request path is measured
+    routes.job_queue.workers = 0
+
+    async def create():
+        response = await routes.create_scrape_job(request, BackgroundTasks(), client=ANONYMOUS)
+        routes.job_queue.cancel(response["job_id"])
+        database.job_writer.discard(response["job_id"])
+
+    async def create_and_flush():
+        # Inserts plus RUNNING/COMPLETED transitions, written as one batch
+        for _ in range(100):
+            response = await routes.create_scrape_job(request, BackgroundTasks(), client=ANONYMOUS)
+            routes.job_queue.cancel(response["job_id"])
+            database.job_writer.update(response["job_id"], {"status": ScrapeJobStatus.RUNNING})
+            database.job_writer.update(response["job_id"], {"status": ScrapeJobStatus.COMPLETED})
+        await database.job_writer.flush()
+        db.jobs.docs = db.jobs.docs[:len(job_ids)]
+
+    async def get_job_uncached():
+        result_cache.invalidate(job_id)
+        await routes.get_job(job_id)
+
+    async def list_jobs():
+        await routes.list_jobs(status=None, limit=100, offset=0)
+
+    async def export_json():
+        response = await routes.export_json(job_id)
+        assert response.body
+
+    async def export_csv():
+        response = await routes.export_csv(job_id)
+        assert response.body
+
+    return [
+        Case("routes.create_scrape_job", create),
+        Case("job_writer.create_100_and_flush", create_and_flush, items_per_call=100),
+        Case("routes.get_job", lambda: routes.get_job(job_id)),
+        Case("routes.get_job.uncached", get_job_uncached),
+        Case("routes.get_result", lambda: routes.get_result(job_id)),
+        Case("routes.list_jobs", list_jobs),
+        Case("routes.analytics", routes.get_analytics),
+        Case("routes.export_json", export_json),
+        Case("routes.export_csv", export_csv),
+    ]
@@ -0,0 +1,75 @@
+"""
+Benchmarks for WebScraper: full static scrapes, each extractor and crawls
+"""
+from typing import List
+
+from bs4 import BeautifulSoup
+
+from app.extraction import compile_schema
+from app.scraper import WebScraper
+from app.metrics import StageTimer
+from benchmarks.fixtures import FixtureServer, synthetic_page
+from benchmarks.harness import Case
+
+
+PRODUCT_SCHEMA = {
+    "name": "product_listing",
+    "fields": [
+        {"name": "heading", "selector": "h1"},
+        {"name": "products", "selector": "li.product", "many": True, "fields": [
+            {"name": "name", "selector": "h3"},
+            {"name": "price", "selector": ".price", "attr": "content", "coerce": "float"},
+            {"name": "url", "selector": "a", "attr": "href", "coerce": "url"},
+        ]},
+    ],
+}
+PRODUCT_SELECTORS = ["h1", "li.product h3", "li.product .price", "li.product a"]
+
+
+def cases(server: FixtureServer) -> List[Case]:
+    scraper = WebScraper()
+    result = []
+
+    for name in server.corpus:
+        url = server.url(f"/corpus/{name}")
+        result.append(Case(f"scrape_static.corpus.{name[:-5]}", lambda url=url: scraper.scrape_static(url)))
+
+    for n in (10, 100, 1000):
+        url = server.url(f"/synthetic/{n}")
+        result.append(Case(f"scrape_static.synthetic.{n}", lambda url=url: scraper.scrape_static(url)))
+
+    # Extractors run against a pre-parsed page so parsing isn't counted
+    html = synthetic_page(500, server.seed)
+    base_url = server.url("/synthetic/500")
+    soup = BeautifulSoup(html, "lxml")
+    text = soup.get_text(separator="\n", strip=True)
+    result.extend([
+        Case("parse.synthetic.500", lambda: BeautifulSoup(html, "lxml")),
+        Case("extract.metadata", lambda: scraper._extract_metadata(soup, base_url)),
+        Case("extract.contact_info", lambda: scraper._extract_contact_info(text)),
+        Case("extract.social_links", lambda: scraper._extract_social_links(soup, base_url)),
+        Case("extract.images_detailed", lambda: scraper._extract_images_detailed(soup, base_url)),
+    ])
+
+    # Schema extraction against the equivalent per-selector extraction
+    listing = BeautifulSoup(server.corpus["product_listing.html"], "lxml")
+    listing_url = server.url("/corpus/product_listing.html")
+    plan = compile_schema(PRODUCT_SCHEMA)
+    result.extend([
+        Case("extract.schema.product_listing", lambda: plan.extract(listing, listing_url)),
+        Case(
+            "extract.selectors.product_listing",
+            lambda: scraper._extract_page(listing, listing_url, PRODUCT_SELECTORS, StageTimer())
+        ),
+    ])
+
+    for pages in (20, 100):
+        start = server.url("/graph/0")
+        result.append(Case(
+            f"crawl_site.graph.{pages}",
+            lambda start=start, pages=pages: scraper._crawl_site(start, max_pages=pages),
+            items_per_call=pages,
+            iterations=5,
+        ))
+
+    return result
@@ -0,0 +1,146 @@
+"""
+Local HTTP fixture server for benchmarks
+
+Serves three kinds of pages so scraper benchmarks never touch the network:
+    /corpus/<name>      recorded pages from benchmarks/corpus/
+    /synthetic/<n>      generated page with n of each extractable element
+    /graph/<i>          node i of a deterministic link graph, for crawls
+"""
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+def load_corpus() -> Dict[str, bytes]:
+    """Read every recorded page in the corpus directory"""
+    pages = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(CORPUS_DIR, name), "rb") as f:
+                pages[name] = f.read()
+    return pages
+
+
+def synthetic_page(n: int, seed: int = 0) -> bytes:
+    """Generate a page with n links, images, paragraphs, headings and meta tags"""
+    rng = random.Random(seed + n)
+    words = ["scrape", "crawler", "data", "page", "python", "market", "report", "update", "contact", "price"]
+
+    def sentence(k):
+        return " ".join(rng.choice(words) for _ in range(k)).capitalize() + "."
+
+    parts = [
+        "<!DOCTYPE html><html><head>",
+        f"<title>Synthetic page {n}</title>",
+        '<meta name="description" content="Synthetic benchmark page">',
+        '<meta property="og:title" content="Synthetic">',
+        '<meta name="twitter:card" content="summary">',
+        '<script type="application/ld+json">{"@type": "WebPage", "name": "Synthetic"}</script>',
+        "</head><body>",
+    ]
+    for i in range(n):
+        parts.append(f"<h{i % 3 + 1}>{sentence(4)}</h{i % 3 + 1}>")
+        parts.append(f"<p>{sentence(30)} Mail info{i}@example.com or call 555-010-{i % 10000:04d}.</p>")
+        parts.append(f'<a href="/synthetic/{i}" title="link {i}">{sentence(3)}</a>')
+        parts.append(f'<img src="/img/{i}.png" alt="image {i}" width="100" height="80" loading="lazy">')
+        if i % 10 == 0:
+            parts.append(f'<a href="https://twitter.com/user{i}">Twitter</a>')
+            parts.append(f'<div itemscope itemtype="https://schema.org/Product"><span itemprop="name">Item {i}</span></div>')
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def link_graph(nodes: int, out_degree: int = 5, seed: int = 0) -> List[List[int]]:
+    """Deterministic random link graph where every node is reachable from node 0"""
+    rng = random.Random(seed)
+    graph = []
+    for i in range(nodes):
+        targets = {(i + 1) % nodes}
+        while len(targets) < min(out_degree, nodes - 1):
+            targets.add(rng.randrange(nodes))
+        targets.discard(i)
+        graph.append(sorted(targets))
+    return graph
+
+
+def graph_page(i: int, graph: List[List[int]]) -> bytes:
+    """Render one node of the link graph as a small HTML page"""
+    links = "".join(f'<a href="/graph/{j}">Node {j}</a>' for j in graph[i])
+    return (
+        f"<html><head><title>Node {i}</title></head>"
+        f"<body><h1>Node {i}</h1><p>This is node {i} of the benchmark link graph.</p>{links}</body></html>"
+    ).encode("utf-8")
+
+
+class FixtureServer:
+    """Threaded HTTP server serving fixture pages on a free localhost port"""
+
+    def __init__(self, graph_nodes: int = 200, seed: int = 0):
+        self.corpus = load_corpus()
+        self.graph = link_graph(graph_nodes, seed=seed)
+        self.seed = seed
+        self._synthetic = {}
+        self._server = None
+        self._thread = None
+
+    def _page(self, path: str):
+        kind, _, arg = path.strip("/").partition("/")
+        if kind == "corpus" and arg in self.corpus:
+            return self.corpus[arg]
+        if kind == "synthetic" and arg.isdigit():
+            n = int(arg)
+            if n not in self._synthetic:
+                self._synthetic[n] = synthetic_page(n, self.seed)
+            return self._synthetic[n]
+        if kind == "graph" and arg.isdigit() and int(arg) < len(self.graph):
+            return graph_page(int(arg), self.graph)
+        return None
+
+    def start(self) -> "FixtureServer":
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                body = fixture._page(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
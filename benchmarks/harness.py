@@ -0,0 +1,108 @@
+"""
+Timing and memory measurement shared by all benchmark modules
+"""
+import asyncio
+import gc
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], Any]  # may return an awaitable, which is run to completion
+    items_per_call: int = 1  # pages (or requests) processed by one call
+    iterations: Optional[int] = None  # override the run-wide default for slow cases
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_case(case: Case, iterations: int, warmup: int = 2) -> Dict[str, Any]:
+    """Run a case, returning throughput, latency percentiles and peak memory"""
+    loop = asyncio.new_event_loop()
+
+    def call():
+        value = case.fn()
+        return loop.run_until_complete(value) if inspect.isawaitable(value) else value
+
+    try:
+        iterations = case.iterations or iterations
+        for _ in range(warmup):
+            call()
+
+        gc.collect()
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+
+        # Separate pass so tracemalloc overhead doesn't skew the timings
+        gc.collect()
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        loop.close()
+
+    total = sum(latencies)
+    return {
+        "name": case.name,
+        "iterations": iterations,
+        "pages_per_sec": round(case.items_per_call * iterations / total, 2) if total else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and revision so result files can be compared"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str) -> List[str]:
+    """Format per-case changes against a previous results file"""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    lines = []
+    for result in current:
+        old = baseline.get(result["name"])
+        if not old:
+            lines.append(f"{result['name']:<45} (new)")
+            continue
+        p50_change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0
+        mem_change = (result["peak_memory_kb"] - old["peak_memory_kb"]) / old["peak_memory_kb"] * 100 if old["peak_memory_kb"] else 0
+        lines.append(f"{result['name']:<45} p50 {p50_change:+7.1f}%   peak mem {mem_change:+7.1f}%")
+    return lines
@@ -0,0 +1,179 @@
+"""
+In-memory stand-in for the motor database used by the job endpoints
+
+Implements only the collection methods app/routes.py calls, with the same
+async signatures, so endpoint benchmarks measure our code rather than a
+network round trip to a real server.
+"""
+import copy
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+
+def _get(doc: Dict[str, Any], dotted: str):
+    value = doc
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, expected in query.items():
+        value = _get(doc, key)
+        if isinstance(expected, dict) and any(k.startswith("$") for k in expected):
+            for op, arg in expected.items():
+                if op == "$ne" and value == arg:
+                    return False
+                if op == "$in" and value not in arg:
+                    return False
+                if op == "$gte" and (value is None or value < arg):
+                    return False
+                if op == "$lte" and (value is None or value > arg):
+                    return False
+                if op == "$lt" and (value is None or value >= arg):
+                    return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    # Shallow copies: the routes never mutate nested values of what they read
+    if not projection:
+        return dict(doc)
+    if not any(projection.values()):
+        return {k: v for k, v in doc.items() if k not in projection}
+    keep = [k for k, v in projection.items() if v]
+    if projection.get("_id", 1):
+        keep.append("_id")
+    return {k: doc[k] for k in keep if k in doc}
+
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+
+    def sort(self, key: str, direction: int = 1):
+        self._docs.sort(key=lambda d: (_get(d, key) is None, _get(d, key)), reverse=direction < 0)
+        return self
+
+    def skip(self, n: int):
+        self._docs = self._docs[n:]
+        return self
+
+    def limit(self, n: int):
+        if n:
+            self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length: Optional[int] = None):
+        return self._docs[:length] if length else list(self._docs)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs: List[Dict[str, Any]] = []
+        self._next_id = 0
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        self._next_id += 1
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", self._next_id)
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True):
+        return SimpleNamespace(inserted_ids=[(await self.insert_one(doc)).inserted_id for doc in docs])
+
+    async def create_index(self, keys: Any, **kwargs):
+        return kwargs.get("name", "index")
+
+    async def find_one(self, query: Dict[str, Any], projection: Optional[Dict[str, int]] = None):
+        for doc in self.docs:
+            if _matches(doc, query):
+                return _project(doc, projection)
+        return None
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None):
+        return FakeCursor([_project(d, projection) for d in self.docs if _matches(d, query or {})])
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(copy.deepcopy(update.get("$set", {})))
+                for key in update.get("$unset", {}):
+                    doc.pop(key, None)
+                return SimpleNamespace(matched_count=1, modified_count=1)
+        return SimpleNamespace(matched_count=0, modified_count=0)
+
+    async def replace_one(self, query: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False):
+        for i, doc in enumerate(self.docs):
+            if _matches(doc, query):
+                self.docs[i] = dict(copy.deepcopy(replacement), _id=doc["_id"])
+                return SimpleNamespace(matched_count=1, modified_count=1)
+        if upsert:
+            await self.insert_one(replacement)
+        return SimpleNamespace(matched_count=0, modified_count=0)
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def bulk_write(self, operations: List[Any], ordered: bool = True):
+        # pymongo operation objects keep their arguments in private attributes
+        for op in operations:
+            name = type(op).__name__
+            if name == "InsertOne":
+                await self.insert_one(op._doc)
+            elif name == "UpdateOne":
+                await self.update_one(op._filter, op._doc, upsert=bool(op._upsert))
+            elif name == "ReplaceOne":
+                await self.replace_one(op._filter, op._doc, upsert=bool(op._upsert))
+            elif name == "DeleteOne":
+                await self.delete_one(op._filter)
+        return SimpleNamespace(acknowledged=True)
+
+    async def delete_one(self, query: Dict[str, Any]):
+        for i, doc in enumerate(self.docs):
+            if _matches(doc, query):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query: Dict[str, Any]):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def count_documents(self, query: Dict[str, Any]):
+        return sum(1 for d in self.docs if _matches(d, query))
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]):
+        # Only the $match + $group/$avg shape used by the analytics route
+        docs = [d for d in self.docs if _matches(d, pipeline[0].get("$match", {}))]
+        group = pipeline[1]["$group"] if len(pipeline) > 1 else None
+        if not group or not docs:
+            return FakeCursor([])
+        out = {"_id": None}
+        for name, spec in group.items():
+            if name != "_id" and "$avg" in spec:
+                values = [_get(d, spec["$avg"].lstrip("$")) for d in docs]
+                values = [v for v in values if v is not None]
+                out[name] = sum(values) / len(values) if values else None
+        return FakeCursor([out])
+
+
+class FakeDatabase:
+    """Attribute access returns (and remembers) a collection, like motor"""
+
+    def __init__(self):
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, FakeCollection())
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return getattr(self, name)
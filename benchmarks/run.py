@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Run the benchmark suite
+
+    python -m benchmarks.run                       # everything
+    python -m benchmarks.run -k extract            # cases whose name contains "extract"
+    python -m benchmarks.run --compare results.json
+
+Results are written as JSON (with machine and commit details) so runs can be
+compared against each other with --compare.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_imports, bench_routes, bench_scraper
+from benchmarks.fixtures import FixtureServer
+from benchmarks.harness import compare, environment, run_case
+
+MODULES = [bench_scraper, bench_routes, bench_imports]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web Scraper benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("-n", "--iterations", type=int, default=20, help="Timed iterations per case")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for generated pages and link graphs")
+    args = parser.parse_args()
+
+    results = []
+    with FixtureServer(seed=args.seed) as server:
+        for module in MODULES:
+            for case in module.cases(server):
+                if args.filter not in case.name:
+                    continue
+                result = run_case(case, args.iterations)
+                results.append(result)
+                print(
+                    f"{result['name']:<45} {result['pages_per_sec'] or 0:>10.1f} pages/s"
+                    f"  p50 {result['p50_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms"
+                    f"  peak {result['peak_memory_kb']:>9.1f} KiB"
+                )
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "seed": args.seed, "results": results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        print(f"\nCompared with {args.compare}:")
+        for line in compare(results, args.compare):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Tests for the fair-share job queue in app/fairshare.py
+"""
+import asyncio
+import json
+
+import app.routes
+from app.fairshare import ANONYMOUS, FairShareQueue, client_id
+
+
+def make_queue(monkeypatch, workers=1, quotas=None):
+    monkeypatch.setenv("JOB_WORKERS", str(workers))
+    monkeypatch.setenv("CLIENT_QUOTAS", json.dumps(quotas or {}))
+    return FairShareQueue()
+
+
+def test_only_listed_keys_get_their_own_client(monkeypatch):
+    queue = make_queue(monkeypatch, quotas={"listed-key": {"weight": 2}})
+    assert queue.client_for("listed-key") == client_id("listed-key")
+    assert queue.client_for("made-up-key") == ANONYMOUS
+    assert queue.client_for(None) == ANONYMOUS
+
+
+def test_anonymous_may_use_every_worker_by_default(monkeypatch):
+    queue = make_queue(monkeypatch, workers=6)
+    assert queue.client(ANONYMOUS).max_concurrent == 6
+
+    queue = make_queue(monkeypatch, workers=6, quotas={"anonymous": {"max_concurrent": 3}})
+    assert queue.client(ANONYMOUS).max_concurrent == 3
+
+
+def test_single_page_jumps_ahead_of_a_queued_crawl(monkeypatch):
+    queue = make_queue(monkeypatch, workers=0, quotas={"crawler": {}, "single": {}})
+
+    async def submit():
+        queue.submit(client_id("crawler"), "crawl-1", 1000, {})
+        queue.submit(client_id("crawler"), "crawl-2", 1000, {})
+        queue.submit(client_id("single"), "page-1", 1, {})
+
+    asyncio.run(submit())
+    assert queue.position("page-1") == {"queue_position": 1, "client_queue_position": 1}
+    assert queue.position("crawl-1") == {"queue_position": 2, "client_queue_position": 1}
+    assert queue.position("crawl-2") == {"queue_position": 3, "client_queue_position": 2}
+    assert queue.position("unknown") is None
+
+
+def test_dispatch_runs_jobs_in_fair_order(monkeypatch):
+    queue = make_queue(monkeypatch, workers=1, quotas={"crawler": {}, "single": {}})
+    started = []
+
+    async def fake_run(job_id):
+        started.append(job_id)
+        if job_id == "page-1":
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(app.routes, "run_scrape_job_bg", fake_run)
+
+    async def run():
+        done = [
+            queue.submit(client_id("crawler"), "crawl-1", 1000, {"job_id": "crawl-1"}),
+            queue.submit(client_id("crawler"), "crawl-2", 1000, {"job_id": "crawl-2"}),
+            queue.submit(client_id("single"), "page-1", 1, {"job_id": "page-1"}),
+        ]
+        await asyncio.gather(*done)
+
+    asyncio.run(run())
+    # crawl-1 took the free slot at once; the single page went before the second crawl
+    assert started == ["crawl-1", "page-1", "crawl-2"]
+    assert queue.running == 0
+    assert not queue._tasks
+
+
+def test_admit_refuses_over_budget_and_full_queues(monkeypatch):
+    queue = make_queue(monkeypatch, workers=0, quotas={"k": {"pages_per_hour": 100, "max_queued": 2}})
+    client = client_id("k")
+
+    async def submit():
+        assert queue.admit(client, 60) is None
+        queue.submit(client, "job-1", 60, {})
+        assert "budget" in queue.admit(client, 50)
+        assert queue.admit(client, 40) is None
+        queue.submit(client, "job-2", 40, {})
+        assert "Too many queued jobs" in queue.admit(client, 0)
+
+    asyncio.run(submit())
+
+
+def test_cancel_removes_a_queued_job(monkeypatch):
+    queue = make_queue(monkeypatch, workers=0)
+
+    async def submit():
+        done = queue.submit(ANONYMOUS, "job-1", 1, {})
+        assert queue.cancel("job-1")
+        assert done.cancelled()
+        assert not queue.cancel("job-1")
+
+    asyncio.run(submit())
+    assert queue.position("job-1") is None
@@ -0,0 +1,152 @@
+"""
+Tests for the JobWriter write-behind buffer in app/database.py
+"""
+import asyncio
+
+import pytest
+
+from app import database
+from app.database import JobWriter
+from benchmarks.mongo_stub import FakeDatabase
+
+
+class SlowJobs:
+    """Wraps a stub collection so bulk_write can be held open or made to fail"""
+
+    def __init__(self, jobs, fail: bool = False):
+        self._jobs = jobs
+        self.fail = fail
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def bulk_write(self, operations, ordered=True):
+        self.started.set()
+        await self.release.wait()
+        if self.fail:
+            raise ConnectionError("primary stepped down")
+        return await self._jobs.bulk_write(operations, ordered=ordered)
+
+    def __getattr__(self, name):
+        return getattr(self._jobs, name)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDatabase()
+    monkeypatch.setattr(database, "get_database", lambda: fake)
+    return fake
+
+
+def slow_down(db, fail: bool = False) -> SlowJobs:
+    slow = SlowJobs(db.jobs, fail)
+    db._collections["jobs"] = slow
+    return slow
+
+
+def test_update_after_insert_merges_into_the_insert(db):
+    async def run():
+        writer = JobWriter()
+        writer.insert({"job_id": "a", "status": "pending", "checkpoint": {"pages": []}})
+        writer.update("a", {"status": "running"})
+        writer.update("a", {"status": "completed"}, unset_fields=["checkpoint"])
+        assert writer._updates == {}
+        await writer.flush()
+
+    asyncio.run(run())
+    assert len(db.jobs.docs) == 1
+    doc = db.jobs.docs[0]
+    assert doc["status"] == "completed"
+    assert "checkpoint" not in doc
+
+
+def test_updates_coalesce_set_and_unset(db):
+    async def run():
+        writer = JobWriter()
+        await db.jobs.insert_one({"job_id": "a", "status": "pending", "error": "old"})
+        writer.update("a", {"error": None}, unset_fields=["status"])
+        writer.update("a", {"status": "running"})
+        assert writer._updates["a"] == {"$set": {"error": None, "status": "running"}, "$unset": {}}
+        await writer.flush()
+
+    asyncio.run(run())
+    assert db.jobs.docs[0]["status"] == "running"
+    assert db.jobs.docs[0]["error"] is None
+
+
+def test_failed_flush_is_requeued_under_newer_writes(db):
+    async def run():
+        writer = JobWriter()
+        writer.insert({"job_id": "a", "status": "pending"})
+        slow = slow_down(db, fail=True)
+        flush = asyncio.create_task(writer.flush())
+        await slow.started.wait()
+        writer.update("a", {"status": "running"})
+        slow.release.set()
+        await flush
+
+        assert db.jobs._jobs.docs == []
+        assert writer._inserts == {"a": {"job_id": "a", "status": "running"}}
+        assert writer._updates == {}
+
+        slow.fail = False
+        await writer.flush()
+
+    asyncio.run(run())
+    assert [d["status"] for d in db.jobs._jobs.docs] == ["running"]
+
+
+def test_overlay_applies_pending_writes(db):
+    writer = JobWriter()
+    writer.insert({"job_id": "new", "status": "pending"})
+    assert writer.overlay("new", None) == {"job_id": "new", "status": "pending"}
+
+    stored = {"job_id": "old", "status": "running", "checkpoint": {}}
+    writer.update("old", {"status": "completed"}, unset_fields=["checkpoint"])
+    assert writer.overlay("old", stored) == {"job_id": "old", "status": "completed"}
+    assert stored["status"] == "running"
+    assert writer.overlay("missing", None) is None
+
+
+def test_inflight_batch_stays_visible(db):
+    async def run():
+        writer = JobWriter()
+        await db.jobs.insert_one({"job_id": "old", "status": "pending"})
+        writer.insert({"job_id": "new", "status": "pending"})
+        writer.update("old", {"status": "running"})
+        slow = slow_down(db)
+        flush = asyncio.create_task(writer.flush())
+        await slow.started.wait()
+
+        assert writer.overlay("new", None)["status"] == "pending"
+        assert writer.overlay("old", {"job_id": "old", "status": "pending"})["status"] == "running"
+        writer.update("new", {"status": "running"})
+        assert writer.overlay("new", None)["status"] == "running"
+        assert [j["job_id"] for j in writer.pending_inserts()] == ["new"]
+
+        slow.release.set()
+        await flush
+        assert writer.pending_inserts() == []
+        await writer.flush()
+
+    asyncio.run(run())
+    assert {d["job_id"]: d["status"] for d in db.jobs._jobs.docs} == {"old": "running", "new": "running"}
+
+
+def test_discarding_an_inflight_insert_deletes_it_after_the_write(db):
+    async def run():
+        writer = JobWriter()
+        writer.insert({"job_id": "a", "status": "pending"})
+        slow = slow_down(db)
+        flush = asyncio.create_task(writer.flush())
+        await slow.started.wait()
+
+        assert writer.discard("a") is True
+        assert writer.overlay("a", None) is None
+        slow.release.set()
+        await flush
+
+    asyncio.run(run())
+    assert db.jobs._jobs.docs == []
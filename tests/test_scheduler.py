@@ -0,0 +1,66 @@
+"""
+Tests for schedule anchoring and claiming in app/scheduler.py
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.scheduler import Scheduler, first_anchor, new_schedule, next_anchor
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def test_first_anchor_is_stable_and_within_one_interval():
+    anchor = first_anchor("schedule-a", 3600, NOW)
+    assert anchor == first_anchor("schedule-a", 3600, NOW)
+    assert NOW <= anchor < NOW + timedelta(seconds=3600)
+
+
+def test_first_anchors_spread_across_the_interval():
+    phases = {(first_anchor(f"schedule-{i}", 3600, NOW) - NOW).total_seconds() for i in range(50)}
+    assert len(phases) > 40
+    assert max(phases) - min(phases) > 1800
+
+
+def test_next_anchor_keeps_the_grid():
+    anchor = NOW - timedelta(seconds=10)
+    assert next_anchor(anchor, 60, NOW) == anchor + timedelta(seconds=60)
+
+
+def test_next_anchor_skips_missed_runs():
+    anchor = NOW - timedelta(seconds=60 * 5 + 10)
+    assert next_anchor(anchor, 60, NOW) == NOW + timedelta(seconds=50)
+
+
+def test_next_anchor_of_a_future_anchor_moves_one_interval():
+    anchor = NOW + timedelta(seconds=30)
+    assert next_anchor(anchor, 60, NOW) == anchor + timedelta(seconds=60)
+
+
+def test_new_schedule_runs_within_jitter_of_its_anchor():
+    schedule = new_schedule({"url": "https://example.com"}, 600, 30, None, True)
+    anchor = datetime.fromisoformat(schedule["anchor_at"])
+    next_run = datetime.fromisoformat(schedule["next_run_at"])
+    assert anchor <= next_run <= anchor + timedelta(seconds=30)
+
+
+class RecordingSchedules:
+    def __init__(self):
+        self.updates = []
+
+    async def find_one_and_update(self, query, update):
+        self.updates.append(update)
+        return {"schedule_id": query["schedule_id"]}
+
+
+def test_claim_leaves_out_an_empty_inc():
+    class Db:
+        schedules = RecordingSchedules()
+
+    schedule = {"schedule_id": "s", "next_run_at": NOW.isoformat()}
+    scheduler = Scheduler()
+    assert asyncio.run(scheduler._claim(Db, schedule, {"next_run_at": "later"}, {}))
+    assert asyncio.run(scheduler._claim(Db, schedule, {"next_run_at": "later"}, {"runs": 1}))
+    assert Db.schedules.updates == [
+        {"$set": {"next_run_at": "later"}},
+        {"$set": {"next_run_at": "later"}, "$inc": {"runs": 1}},
+    ]